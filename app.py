@@ -1,17 +1,22 @@
 import os
 import pandas as pd
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify, Response
 from werkzeug.utils import secure_filename
 from datetime import datetime
 import json
+import math
 import traceback
 import numpy as np
-import csv
-import re
-import tempfile
-import chardet
+from chardet.universaldetector import UniversalDetector
 import io
+import codecs
+import mmap
+from functools import lru_cache
+import threading
+import time
+import logging
 
+from utils.csv_utils import pacsv, read_csv_fast
 from utils.simple_cleaner import SimpleDataCleaner as DataCleaner
 from config import Config
 from utils.file_handler import FileHandler
@@ -19,8 +24,43 @@ from utils.file_handler import FileHandler
 app = Flask(__name__)
 app.config.from_object(Config)
 
+# The cleaner reports progress through logging; show it on the console
+# however the app is served (python app.py, flask run, gunicorn)
+_cleaner_logger = logging.getLogger('utils.simple_cleaner')
+if not _cleaner_logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    _cleaner_logger.addHandler(_handler)
+    _cleaner_logger.setLevel(logging.INFO)
+
 # Initialize file handler
-file_handler = FileHandler(app.config['UPLOAD_FOLDER'])
+file_handler = FileHandler(app.config['UPLOAD_FOLDER'], use_polars=app.config.get('POLARS_IO', False))
+
+def _janitor_loop(interval=60):
+    """Remove expired uploads in the background, off the request path"""
+    while True:
+        time.sleep(interval)
+        try:
+            file_handler.cleanup_old_files(app.config['FILE_LIFETIME'].total_seconds() / 3600)
+        except Exception as e:
+            print(f"Cleanup failed: {e}")
+
+_janitor = None
+_janitor_lock = threading.Lock()
+
+@app.before_request
+def start_janitor():
+    """Start the cleanup thread on the first request, once per worker process"""
+    global _janitor
+    if _janitor is not None or not app.config.get('UPLOAD_JANITOR'):
+        return
+    with _janitor_lock:
+        if _janitor is None:
+            _janitor = threading.Thread(target=_janitor_loop, name='upload-janitor', daemon=True)
+            _janitor.start()
+
+# Lookup tables shared by every request
+_ALLOWED_EXTS = frozenset(Config.ALLOWED_EXTENSIONS)
 
 # Context processor for templates
 @app.context_processor
@@ -28,242 +68,237 @@ def inject_now():
     return {'now': datetime.now()}
 
 def allowed_file(filename):
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+    i = filename.rfind('.')
+    return i >= 0 and filename[i + 1:].lower() in _ALLOWED_EXTS
 
-def convert_to_serializable(obj):
-    """Convert object to JSON serializable format"""
-    if isinstance(obj, (np.integer, np.int64, np.int32, np.int16, np.int8)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, np.float64, np.float32, np.float16)):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    elif pd.isna(obj):
+def cleaner_options(options):
+    """Copy of the request's cleaning options plus the ones the app config decides"""
+    options = dict(options or {}, stream_threshold=app.config['STREAM_THRESHOLD'])
+    if app.config.get('POLARS_IO'):
+        options.setdefault('engine', 'polars')
+    return options
+
+def cleaner_reads_itself(filepath):
+    """CSVs the cleaner loads on its own: all of them for the polars engine, large ones to stream"""
+    if app.config.get('POLARS_IO'):
+        return True
+    if pacsv is None:
+        # Streaming needs pyarrow, without it the up-front read is as good as any
+        return False
+    try:
+        return os.path.getsize(filepath) > app.config['STREAM_THRESHOLD']
+    except OSError:
+        return False
+
+# Exact-type converters for the values that show up in cleaning reports
+_SCALAR_CONVERTERS = {
+    np.int64: int, np.int32: int, np.int16: int, np.int8: int,
+    np.uint64: int, np.uint32: int, np.uint16: int, np.uint8: int,
+    np.float64: float, np.float32: float, np.float16: float,
+    np.bool_: bool,
+    np.ndarray: np.ndarray.tolist,
+    pd.Series: pd.Series.tolist,
+    pd.Timestamp: pd.Timestamp.isoformat,
+}
+
+def _convert_scalar(obj):
+    """Convert a single leaf value to a JSON serializable one"""
+    convert = _SCALAR_CONVERTERS.get(type(obj))
+    if convert is not None:
+        obj = convert(obj)
+    elif isinstance(obj, np.generic):
+        obj = obj.item()
+    elif obj is pd.NaT or obj is pd.NA:
         return None
-    elif isinstance(obj, pd.Timestamp):
-        return obj.isoformat()
-    elif isinstance(obj, pd.Series):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {k: convert_to_serializable(v) for k, v in obj.items()}
+    
+    if isinstance(obj, float) and not math.isfinite(obj):
+        # NaN and infinity are not valid JSON
+        return None
+    return obj
+
+def convert_to_serializable(obj):
+    """Convert object to JSON serializable format, updating dicts and lists in place"""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            obj[k] = convert_to_serializable(v)
+        return obj
     elif isinstance(obj, list):
-        return [convert_to_serializable(item) for item in obj]
+        for i, item in enumerate(obj):
+            obj[i] = convert_to_serializable(item)
+        return obj
     elif isinstance(obj, tuple):
         return tuple(convert_to_serializable(item) for item in obj)
     else:
-        return obj
+        return _convert_scalar(obj)
+
+def _json_safe(obj):
+    """Copy of obj with every leaf converted by _convert_scalar"""
+    if isinstance(obj, dict):
+        return {k: _json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_safe(item) for item in obj]
+    obj = _convert_scalar(obj)
+    if isinstance(obj, list):
+        # Arrays and Series come back as lists that may hold NaN
+        return [_json_safe(item) for item in obj]
+    return obj
+
+class NpEncoder(json.JSONEncoder):
+    """JSON encoder that understands numpy and pandas scalars"""
+    def iterencode(self, o, _one_shot=False):
+        # Convert a copy up front rather than in default(): Python floats never
+        # reach default(), so NaN and infinity could not be mapped to None there
+        return super().iterencode(_json_safe(o), _one_shot)
+
+def json_response(payload, status=200, **raw_fields):
+    """
+    Serialize payload once with NpEncoder and return it as a JSON response.
+    raw_fields are strings that are already JSON (e.g. from DataFrame.to_json)
+    and are spliced in as-is instead of being decoded and re-encoded.
+    """
+    body = json.dumps(payload, cls=NpEncoder)
+    if raw_fields:
+        extra = ', '.join(f'{json.dumps(key)}: {value}' for key, value in raw_fields.items())
+        body = body[:-1] + (', ' if payload else '') + extra + '}'
+    return Response(body, status=status, mimetype='application/json')
 
 def detect_file_encoding(filepath):
-    """Detect file encoding with chardet"""
+    """Detect file encoding, reusing the result while the file is unchanged"""
+    try:
+        mtime = os.path.getmtime(filepath)
+    except OSError as e:
+        print(f"Encoding detection failed: {e}")
+        return 'utf-8'
+    return _detect_file_encoding(filepath, mtime)
+
+@lru_cache(maxsize=128)
+def _detect_file_encoding(filepath, mtime):
+    """Detect file encoding, only running chardet when the cheap checks fail"""
     try:
-        with open(filepath, 'rb') as f:
-            raw_data = f.read(100000)  # Read more data for better detection
-            result = chardet.detect(raw_data)
-            encoding = result['encoding']
-            confidence = result['confidence']
-            print(f"Detected encoding: {encoding} (confidence: {confidence})")
-            return encoding if confidence > 0.7 else 'utf-8'
+        if os.path.getsize(filepath) == 0:
+            # Nothing to detect, and mmap cannot map an empty file
+            return 'utf-8'
+        
+        # Slicing the map reads straight from the page cache
+        with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _detect_buffer_encoding(mm)
     except Exception as e:
         print(f"Encoding detection failed: {e}")
         return 'utf-8'
 
-def read_csv_with_fallbacks(filepath):
+def _detect_buffer_encoding(buf):
+    """Detect the encoding of a bytes-like buffer (bytes or mmap)"""
+    try:
+        # A byte order mark settles the encoding without any analysis
+        head = buf[:4]
+        if head.startswith(b'\xef\xbb\xbf'):
+            print("Detected encoding: utf-8-sig (BOM)")
+            return 'utf-8-sig'
+        if head.startswith((b'\xff\xfe', b'\xfe\xff')):
+            print("Detected encoding: utf-16 (BOM)")
+            return 'utf-16'
+
+        # Valid UTF-8 (plain ASCII included) needs no guessing; chardet often
+        # labels it a single-byte codepage, which decodes without error into mojibake.
+        # NUL bytes point at UTF-16 without a BOM, leave those to chardet
+        sample = buf[:65536]
+        if b'\x00' not in sample:
+            try:
+                # final=False tolerates a multibyte character cut off by the sample limit
+                codecs.utf_8_decode(sample, 'strict', False)
+                print("Detected encoding: utf-8 (valid sample)")
+                return 'utf-8'
+            except UnicodeDecodeError:
+                pass
+
+        # Feed chardet incrementally and stop as soon as it is confident
+        detector = UniversalDetector()
+        for start in range(0, min(len(buf), 65536), 4096):
+            detector.feed(buf[start:start + 4096])
+            if detector.done:
+                break
+        detector.close()
+        result = detector.result
+        encoding = result['encoding']
+        confidence = result['confidence']
+        print(f"Detected encoding: {encoding} (confidence: {confidence})")
+        return encoding if confidence > 0.7 else 'utf-8'
+    except Exception as e:
+        print(f"Encoding detection failed: {e}")
+        return 'utf-8'
+
+def save_and_detect_encoding(file, filename):
+    """Save an upload, detecting its encoding from the stream head so the saved file is never re-read"""
+    head = file.stream.read(65536)
+    file.stream.seek(0)
+    encoding = _detect_buffer_encoding(head)
+    return file_handler.save_uploaded_file(file, filename), encoding
+
+def read_csv_with_fallbacks(filepath, encoding=None):
     """
-    Read CSV file with multiple fallback strategies
-    Returns DataFrame
+    Read CSV file with a single encoding-guided parse, falling back only on errors
+    Pass encoding to skip detection when it is already known
+    Returns (DataFrame, encoding)
     """
     print(f"\nReading CSV: {filepath}")
     print("-" * 50)
     
-    # Strategy 1: Try standard pandas read with various encodings
-    encodings = ['utf-8', 'latin1', 'cp1252', 'iso-8859-1', 'utf-16', 'ascii']
+    if encoding is None:
+        encoding = detect_file_encoding(filepath)
     
-    for encoding in encodings:
+    # Fast path: pyarrow's multithreaded reader, when installed and enabled
+    df = None
+    if pacsv is not None and app.config.get('FAST_IO'):
         try:
-            print(f"Trying pandas with {encoding} encoding...")
-            df = pd.read_csv(filepath, encoding=encoding)
-            if not df.empty and len(df.columns) > 1:
-                print(f"✓ Success with {encoding}! Shape: {df.shape}")
-                return df
+            print(f"Trying pyarrow engine with {encoding} encoding...")
+            # Same header names and text dates as the C engine below
+            df = read_csv_fast(filepath, encoding)
         except Exception as e:
-            print(f"✗ Failed with {encoding}: {str(e)[:100]}")
+            print(f"✗ pyarrow failed: {str(e)[:100]}")
+            df = None
     
-    # Strategy 2: Try with error handling
-    for encoding in encodings:
+    if df is None:
+        # Strategy 1: One pass with the C engine using the detected encoding
         try:
-            print(f"Trying pandas with error handling ({encoding})...")
-            df = pd.read_csv(filepath, encoding=encoding, on_bad_lines='skip', engine='python')
-            if not df.empty:
-                print(f"✓ Success with error handling! Shape: {df.shape}")
-                return df
+            try:
+                print(f"Trying pandas C engine with {encoding} encoding...")
+                df = pd.read_csv(filepath, encoding=encoding, engine='c', low_memory=False)
+            except UnicodeDecodeError as e:
+                # latin1 maps every byte, so this retry cannot fail on decoding
+                print(f"✗ Failed with {encoding}: {str(e)[:100]}")
+                encoding = 'latin1'
+                print("Retrying with latin1 encoding...")
+                df = pd.read_csv(filepath, encoding=encoding, engine='c', low_memory=False)
+        except pd.errors.ParserError as e:
+            # Strategy 2: Malformed rows, skip them with the python engine
+            print(f"✗ Failed: {str(e)[:100]}")
+            try:
+                print(f"Trying pandas with error handling ({encoding})...")
+                df = pd.read_csv(filepath, encoding=encoding, on_bad_lines='skip', engine='python')
+            except Exception as e:
+                print(f"✗ Failed: {str(e)[:100]}")
+                df = pd.DataFrame()
         except Exception as e:
             print(f"✗ Failed: {str(e)[:100]}")
+            df = pd.DataFrame()
     
-    # Strategy 3: Manual CSV parsing
-    print("Trying manual CSV parsing...")
-    df = manual_csv_parse(filepath)
-    if not df.empty:
-        print(f"✓ Manual parsing succeeded! Shape: {df.shape}")
-        return df
-    
-    # Strategy 4: Try reading as text and parsing
-    print("Trying text-based parsing...")
-    df = text_based_csv_parse(filepath)
     if not df.empty:
-        print(f"✓ Text parsing succeeded! Shape: {df.shape}")
-        return df
-    
-    print("✗ All CSV reading strategies failed")
-    return pd.DataFrame()
-
-def manual_csv_parse(filepath):
-    """Manual CSV parsing"""
-    rows = []
-    
-    # Try different encodings
-    encodings = ['utf-8', 'latin1', 'cp1252', 'iso-8859-1', 'utf-16']
-    
-    for encoding in encodings:
-        try:
-            with open(filepath, 'r', encoding=encoding, errors='replace') as f:
-                # Read first few lines to check format
-                lines = []
-                for i, line in enumerate(f):
-                    if i < 50:  # Read first 50 lines
-                        lines.append(line.strip())
-                    else:
-                        break
-                
-                if lines:
-                    # Try to detect delimiter
-                    delimiters = [',', ';', '\t', '|']
-                    delimiter_counts = {d: lines[0].count(d) for d in delimiters}
-                    delimiter = max(delimiter_counts, key=delimiter_counts.get)
-                    
-                    # Parse with csv module
-                    f.seek(0)
-                    reader = csv.reader(f, delimiter=delimiter)
-                    rows = list(reader)
-                    break
-        except Exception as e:
-            continue
+        print(f"✓ Success with {encoding}! Shape: {df.shape}")
+        return df, encoding
     
-    if not rows:
-        # Last resort: simple split
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                rows.append(line.strip().split(','))
-    
-    if len(rows) > 1:
-        # Find max columns
-        max_cols = max(len(row) for row in rows)
-        
-        # Pad rows with fewer columns
-        for i in range(len(rows)):
-            if len(rows[i]) < max_cols:
-                rows[i].extend([''] * (max_cols - len(rows[i])))
-        
-        # Create DataFrame
-        df = pd.DataFrame(rows[1:], columns=rows[0])
-    else:
-        df = pd.DataFrame()
-    
-    return df
-
-def text_based_csv_parse(filepath):
-    """Parse CSV by reading as text and cleaning"""
+    # Last resort: let pandas sniff the delimiter and skip malformed rows
     try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        # Clean the content
-        content = clean_csv_content(content)
-        
-        # Try to parse
-        try:
-            df = pd.read_csv(io.StringIO(content))
-            return df
-        except:
-            # Manual parsing
-            lines = content.strip().split('\n')
-            if lines:
-                # Guess delimiter
-                first_line = lines[0]
-                delimiters = [',', ';', '\t', '|']
-                delimiter_counts = {d: first_line.count(d) for d in delimiters}
-                delimiter = max(delimiter_counts, key=delimiter_counts.get)
-                
-                # Parse
-                rows = []
-                for line in lines:
-                    rows.append([cell.strip() for cell in line.split(delimiter)])
-                
-                if len(rows) > 1:
-                    df = pd.DataFrame(rows[1:], columns=rows[0])
-                    return df
+        print(f"Trying delimiter sniffing with {encoding} encoding...")
+        df = pd.read_csv(filepath, sep=None, engine='python', on_bad_lines='skip',
+                         encoding=encoding, encoding_errors='replace')
+        if not df.empty:
+            print(f"✓ Sniffed parsing succeeded! Shape: {df.shape}")
+            return df, encoding
     except Exception as e:
-        print(f"Text parsing error: {e}")
-    
-    return pd.DataFrame()
-
-def clean_csv_content(content):
-    """Clean CSV content"""
-    # Fix line endings
-    content = content.replace('\r\n', '\n').replace('\r', '\n')
-    
-    # Remove BOM
-    if content.startswith('\ufeff'):
-        content = content[1:]
-    
-    # Fix common encoding issues
-    replacements = {
-        'Â': '',
-        'â€': '-',
-        'Ã©': 'é',
-        'Ã': 'í',
-        'Ã³': 'ó',
-        'Ã¡': 'á',
-        'Ã±': 'ñ',
-        'Ãº': 'ú',
-        'Ã¼': 'ü',
-        'Ã§': 'ç',
-        '\xa0': ' ',
-        '\x96': '-',
-        '\x97': '-',
-    }
+        print(f"✗ Failed: {str(e)[:100]}")
     
-    for old, new in replacements.items():
-        content = content.replace(old, new)
-    
-    # Remove empty lines
-    lines = [line for line in content.split('\n') if line.strip()]
-    
-    # Ensure consistent columns
-    if lines:
-        # Count commas in first line (header)
-        header = lines[0]
-        comma_count = header.count(',')
-        
-        cleaned_lines = [header]
-        for line in lines[1:]:
-            line_comma_count = line.count(',')
-            if line_comma_count < comma_count:
-                # Add missing commas
-                line += ',' * (comma_count - line_comma_count)
-            elif line_comma_count > comma_count:
-                # Remove extra commas (keep first N+1 fields)
-                parts = line.split(',')
-                if len(parts) > comma_count + 1:
-                    # Merge extra fields into last column
-                    line = ','.join(parts[:comma_count]) + ',"' + ','.join(parts[comma_count:]) + '"'
-            cleaned_lines.append(line)
-        
-        content = '\n'.join(cleaned_lines)
-    
-    return content
+    print("✗ All CSV reading strategies failed")
+    return pd.DataFrame(), encoding
 
 def create_debug_file(filepath, df):
     """Create debug file to see what was read"""
@@ -275,7 +310,10 @@ def create_debug_file(filepath, df):
         f.write("\nFirst 5 rows:\n")
         f.write(df.head().to_string())
         f.write("\n\nDataFrame info:\n")
-        f.write(str(df.info()))
+        # df.info() prints and returns None, so capture it in a buffer
+        info = io.StringIO()
+        df.info(buf=info)
+        f.write(info.getvalue())
     
     print(f"Debug file created: {debug_path}")
     return debug_path
@@ -302,54 +340,46 @@ def index():
                 
                 # Save uploaded file
                 filename = secure_filename(file.filename)
-                original_path = file_handler.save_uploaded_file(file, filename)
+                detected_encoding = None
+                if app.config.get('ASYNC_UPLOAD') and filename.lower().endswith('.csv'):
+                    original_path, detected_encoding = save_and_detect_encoding(file, filename)
+                else:
+                    original_path = file_handler.save_uploaded_file(file, filename)
                 print(f"Original file saved to: {original_path}")
                 
                 # Get cleaning options from form
-                cleaning_options = {
+                cleaning_options = cleaner_options({
                     'handle_missing': request.form.get('handle_missing', 'auto'),
                     'missing_threshold': float(request.form.get('missing_threshold', 0.5)),
                     'handle_duplicates': request.form.get('handle_duplicates', 'drop'),
+                    'approximate_duplicates': request.form.get('approximate_duplicates') == 'on',
                     'standardize_dates': request.form.get('standardize_dates') == 'on',
                     'remove_outliers': request.form.get('remove_outliers') == 'on',
                     'outlier_method': request.form.get('outlier_method', 'iqr'),
                     'standardize_text': request.form.get('standardize_text') == 'on',
                     'infer_types': request.form.get('infer_types') == 'on',
                     'encoding': request.form.get('encoding', 'utf-8')
-                }
+                })
                 
                 print(f"Cleaning options: {cleaning_options}")
                 
                 # Read the file first to check if it's valid
                 print("\nAttempting to read file...")
-                if filename.lower().endswith('.csv'):
-                    df_raw = read_csv_with_fallbacks(original_path)
+                if filename.lower().endswith('.csv') and not cleaner_reads_itself(original_path):
+                    df_raw, encoding = read_csv_with_fallbacks(original_path, detected_encoding)
                     
                     if df_raw.empty:
-                        # Try one more approach: read as text and save as fixed CSV
-                        print("Raw reading failed, trying text-based approach...")
-                        with open(original_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                        
-                        # Create a fixed version
-                        temp_file = tempfile.NamedTemporaryFile(
-                            mode='w', delete=False, suffix='.csv', encoding='utf-8'
-                        )
-                        temp_path = temp_file.name
-                        temp_file.write(clean_csv_content(content))
-                        temp_file.close()
-                        
-                        print(f"Created fixed CSV: {temp_path}")
-                        filepath = temp_path
+                        # Let the cleaner's own readers have a go at the file
+                        print("Raw reading failed, falling back to DataCleaner readers...")
+                        cleaner = DataCleaner(original_path, cleaning_options)
                     else:
-                        filepath = original_path
-                        print(f"File read successfully, shape: {df_raw.shape}")
+                        print(f"File read successfully, shape: {df_raw.shape}, encoding: {encoding}")
+                        cleaner = DataCleaner(original_path, cleaning_options, df=df_raw)
                 else:
-                    filepath = original_path
-                
-                # Initialize data cleaner
-                print(f"\nInitializing DataCleaner with: {filepath}")
-                cleaner = DataCleaner(filepath, cleaning_options)
+                    # Initialize data cleaner
+                    print(f"\nInitializing DataCleaner with: {original_path}")
+                    cleaner = DataCleaner(original_path, cleaning_options)
+                filepath = original_path
                 
                 # Check if DataFrame was loaded
                 if cleaner.df is None or cleaner.df.empty:
@@ -362,8 +392,9 @@ def index():
                 print(f"  First few rows:")
                 print(cleaner.df.head(3).to_string())
                 
-                # Create debug file
-                debug_path = create_debug_file(filepath, cleaner.df)
+                # Create debug file (left in the upload folder for inspection)
+                if app.config.get('DEBUG_DUMP', False):
+                    create_debug_file(filepath, cleaner.df)
                 
                 # Perform cleaning
                 cleaning_report = cleaner.clean_data()
@@ -374,43 +405,14 @@ def index():
                 # Save cleaned data
                 cleaned_filename = f"cleaned_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}"
                 cleaned_filepath = file_handler.save_cleaned_data(cleaner.df, cleaned_filename)
+                # Uncommon extensions are saved as CSV, link to the file that was written
+                cleaned_filename = os.path.basename(cleaned_filepath)
                 print(f"Cleaned data saved to: {cleaned_filepath}")
                 
                 # Save cleaning report
                 report_filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
                 report_path = file_handler.save_cleaning_report(serializable_report, report_filename)
                 
-                # Clean up temporary files
-                if 'temp_path' in locals() and os.path.exists(temp_path):
-                    try:
-                        os.unlink(temp_path)
-                        print(f"Cleaned up temporary file: {temp_path}")
-                    except:
-                        pass
-                
-                if os.path.exists(debug_path):
-                    try:
-                        os.unlink(debug_path)
-                    except:
-                        pass
-                
-                # Clean up old files
-                file_handler.cleanup_old_files()
-                
-                # Convert DataFrame to HTML for display
-                try:
-                    df_html = cleaner.df.head(10).to_html(
-                        classes='table table-striped', 
-                        index=False,
-                        na_rep=''
-                    )
-                except Exception as e:
-                    print(f"Error creating HTML: {e}")
-                    # Simple HTML fallback
-                    df_html = "<div class='alert alert-warning'>"
-                    df_html += "Data preview is not available. Download the cleaned file to view results."
-                    df_html += "</div>"
-                
                 print(f"\nCleaning completed successfully!")
                 print(f"Original: {cleaning_report.get('original_rows', '?')} rows")
                 print(f"Cleaned: {cleaning_report.get('final_rows', '?')} rows")
@@ -420,7 +422,6 @@ def index():
                                      original_filename=filename,
                                      cleaned_filename=cleaned_filename,
                                      report=serializable_report,
-                                     data_preview=df_html,
                                      columns=list(cleaner.df.columns))
                 
             except Exception as e:
@@ -450,6 +451,22 @@ def download_file(filename):
         flash(f'Error downloading file: {str(e)}')
         return redirect(url_for('index'))
 
+@app.route('/preview_html/<filename>')
+def preview_html(filename):
+    """Render the first rows of a cleaned file as an HTML table"""
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(filename))
+    if not os.path.isfile(filepath):
+        return Response('Cleaned file not found', status=404, mimetype='text/plain')
+    
+    try:
+        df = file_handler.load_head(filepath, 10)
+        html = df.to_html(border=0, index=False, na_rep='')
+    except Exception as e:
+        print(f"Error creating HTML: {e}")
+        return Response('Data preview is not available', status=500, mimetype='text/plain')
+    
+    return Response(html, mimetype='text/html')
+
 @app.route('/api/clean', methods=['POST'])
 def api_clean():
     """API endpoint for programmatic data cleaning"""
@@ -462,44 +479,40 @@ def api_clean():
             filename = secure_filename(file.filename)
             original_path = file_handler.save_uploaded_file(file, filename)
             
-            # Read file
-            if filename.lower().endswith('.csv'):
-                df_raw = read_csv_with_fallbacks(original_path)
-                if df_raw.empty:
-                    return jsonify({'error': 'Could not read CSV file'}), 400
-                filepath = original_path
-            else:
-                filepath = original_path
-            
             # Get options from JSON or form data
             if request.is_json:
                 options = request.get_json()
             else:
                 options = request.form.to_dict()
+            options = cleaner_options(options)
             
-            cleaner = DataCleaner(filepath, options)
+            # Read file
+            if filename.lower().endswith('.csv') and not cleaner_reads_itself(original_path):
+                df_raw, encoding = read_csv_with_fallbacks(original_path)
+                if df_raw.empty:
+                    return jsonify({'error': 'Could not read CSV file'}), 400
+                cleaner = DataCleaner(original_path, options, df=df_raw)
+            else:
+                cleaner = DataCleaner(original_path, options)
             
             if cleaner.df.empty:
                 return jsonify({'error': 'File is empty'}), 400
             
             cleaning_report = cleaner.clean_data()
             
-            # Convert to serializable format
-            serializable_report = convert_to_serializable(cleaning_report)
-            
-            # Convert DataFrame to serializable format
-            df_data = cleaner.df.head(100).to_dict(orient='records')
-            serializable_data = convert_to_serializable(df_data)
+            # Let pandas encode the rows directly instead of going through Python dicts
+            data_json = cleaner.df.head(100).to_json(
+                orient='records', date_format='iso', default_handler=str
+            )
             
             # Return cleaned data as JSON
             result = {
-                'report': serializable_report,
-                'data': serializable_data,
+                'report': cleaning_report,
                 'columns': list(cleaner.df.columns),
                 'shape': [int(cleaner.df.shape[0]), int(cleaner.df.shape[1])]
             }
             
-            return jsonify(result)
+            return json_response(result, data=data_json)
         else:
             return jsonify({'error': 'Invalid file type'}), 400
     except Exception as e:
@@ -519,7 +532,7 @@ def preview():
             
             # Load data
             if filename.lower().endswith('.csv'):
-                df = read_csv_with_fallbacks(filepath)
+                df, encoding = read_csv_with_fallbacks(filepath)
             else:
                 df = file_handler.load_file(filepath)
             
@@ -533,19 +546,17 @@ def preview():
                     'missing_values': {}
                 }), 400
             
-            # Convert DataFrame to serializable format
-            head_data = df.head(10).to_dict(orient='records')
-            serializable_head = convert_to_serializable(head_data)
+            # Encode the head rows straight from the frame
+            head_json = df.head(10).to_json(orient='records', date_format='iso', default_handler=str)
             
             preview = {
-                'head': serializable_head,
                 'columns': list(df.columns),
                 'shape': [int(df.shape[0]), int(df.shape[1])],
                 'dtypes': df.dtypes.astype(str).to_dict(),
-                'missing_values': convert_to_serializable(df.isnull().sum().to_dict())
+                'missing_values': df.isnull().sum().to_dict()
             }
             
-            return jsonify(preview)
+            return json_response(preview, head=head_json)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     return jsonify({'error': 'Invalid file'}), 400
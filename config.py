@@ -9,11 +9,29 @@ class Config:
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'static/uploads')
     
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB max file size
+    
+    # CSV uploads above this size skip the up-front read so the cleaner can stream them
+    STREAM_THRESHOLD = MAX_CONTENT_LENGTH // 2
     ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls', 'json', 'txt'}
     
+    # Parse CSV uploads with pyarrow first when it is installed
+    FAST_IO = True
+    
+    # Read and write CSVs with Polars when it is installed (large files)
+    POLARS_IO = os.environ.get('POLARS_IO', '').lower() in ('1', 'true', 'yes')
+    
+    # Detect CSV encodings from the upload stream rather than re-reading the saved file
+    ASYNC_UPLOAD = True
+    
+    # Write a .debug.txt dump of each parsed upload next to it
+    DEBUG_DUMP = os.environ.get('DEBUG_DUMP', '').lower() in ('1', 'true', 'yes')
+    
     # Cleanup old files after 1 hour
     FILE_LIFETIME = timedelta(hours=1)
     
+    # Run the background thread that removes expired uploads (tests turn it off)
+    UPLOAD_JANITOR = True
+    
     # Data cleaning defaults
     DEFAULT_MISSING_THRESHOLD = 0.5
     DEFAULT_DUPLICATE_ACTION = 'drop'
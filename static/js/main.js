@@ -115,6 +115,23 @@ $(document).ready(function() {
         }
     });
 
+    // Cleaned data preview on the results page, rendered on demand
+    $('[data-preview-url]').each(function() {
+        const $container = $(this);
+        $.get($container.data('preview-url'))
+            .done(function(html) {
+                $container.html(html);
+                $container.find('table').addClass('table table-striped');
+            })
+            .fail(function() {
+                $container.html(`
+                    <div class="alert alert-warning">
+                        Data preview is not available. Download the cleaned file to view results.
+                    </div>
+                `);
+            });
+    });
+
     // Range slider value display
     $('input[type="range"]').on('input', function() {
         const value = $(this).val();
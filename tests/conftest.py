@@ -0,0 +1,26 @@
+import os
+import sys
+
+# Tests import the app modules from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_upload_janitor(monkeypatch):
+    """Keep the background cleanup thread from starting during tests"""
+    import app
+
+    monkeypatch.setitem(app.app.config, 'UPLOAD_JANITOR', False)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Test client whose uploads and cleaned files land in tmp_path"""
+    import app
+
+    monkeypatch.setitem(app.app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app.file_handler, 'upload_folder', str(tmp_path))
+    app.app.config['TESTING'] = True
+    return app.app.test_client()
@@ -0,0 +1,426 @@
+import io
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+
+def _ascii_rows(n):
+    return [f'{i},row{i},ok' for i in range(n)]
+
+
+@pytest.mark.parametrize('head_rows, tail', [
+    # Short file that chardet labels MacRoman
+    (20, ['20,"façade",x']),
+    # Non-ASCII only after the ASCII-only head of the file
+    (2000, ['9001,Emoji 😊,x', '9002,"café, naïve",x', '9003,Ünïcödé straße,x']),
+])
+def test_utf8_upload_keeps_non_ascii_text(tmp_path, head_rows, tail):
+    path = tmp_path / 'utf8.csv'
+    lines = ['id,name,note'] + _ascii_rows(head_rows) + tail
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    assert app.detect_file_encoding(str(path)) == 'utf-8'
+
+    df, encoding = app.read_csv_with_fallbacks(str(path))
+    assert encoding == 'utf-8'
+    expected = pd.read_csv(path, encoding='utf-8')
+    assert df['name'].tolist() == expected['name'].tolist()
+
+
+def test_latin1_upload_still_detected(tmp_path):
+    path = tmp_path / 'latin1.csv'
+    path.write_bytes('id,text\n1,café crème\n2,naïve\n'.encode('latin1'))
+
+    df, _ = app.read_csv_with_fallbacks(str(path))
+    assert 'café crème' in set(df['text'])
+
+
+def _clean_csv(tmp_path, text, cleaner_module='utils.simple_cleaner', **options):
+    import importlib
+
+    path = tmp_path / 'input.csv'
+    path.write_text(text, encoding='utf-8')
+    cleaner = importlib.import_module(cleaner_module).SimpleDataCleaner(str(path), options)
+    report = cleaner.clean_data()
+    return cleaner.df, report
+
+
+def test_constant_column_dropped_when_others_remain(tmp_path):
+    df, report = _clean_csv(tmp_path, 'id,status\n1,ok\n2,ok\n3,ok\n')
+    assert list(df.columns) == ['id']
+    assert report['columns_removed'] == 1
+
+
+@pytest.mark.parametrize('cleaner_module', ['utils.simple_cleaner', 'utils.data_cleaner'])
+@pytest.mark.parametrize('text, shape', [
+    ('status\nok\nok\nok\n', (1, 1)),
+    ('a,b\n1,1\n1,1\n1,1\n', (1, 2)),
+])
+def test_all_constant_frame_is_kept(tmp_path, text, shape, cleaner_module):
+    df, report = _clean_csv(tmp_path, text, cleaner_module)
+    assert df.shape == shape
+    assert report['duplicates_removed'] == 2
+
+
+def test_all_columns_dropped_for_missing_values(tmp_path):
+    df, report = _clean_csv(tmp_path, 'a,b,c\n1,,\n,,x\n,,\n', standardize_text=True)
+    assert df.shape[1] == 0
+    assert report['final_columns'] == 0
+
+
+def test_hash_dedup_matches_drop_duplicates(tmp_path):
+    import numpy as np
+    import warnings
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        'key': rng.integers(0, 20, 500),
+        'value': rng.integers(0, 3, 500).astype(float),
+        'label': rng.choice(['a ', ' b', 'c'], 500),
+    })
+    path = tmp_path / 'dups.csv'
+    frame.to_csv(path, index=False)
+
+    from utils.simple_cleaner import SimpleDataCleaner
+    cleaner = SimpleDataCleaner(str(path), {'standardize_text': True})
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', pd.errors.SettingWithCopyWarning)
+        report = cleaner.clean_data()
+
+    expected = pd.read_csv(path).drop_duplicates()
+    expected['label'] = expected['label'].str.strip()
+    assert report['duplicates_removed'] == 500 - len(expected)
+    pd.testing.assert_frame_equal(cleaner.df, expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_cleaner_reads_utf8_that_chardet_misreads(tmp_path):
+    text = '\n'.join(['id,name,note'] + _ascii_rows(20) + ['20,"façade",x']) + '\n'
+    df, _ = _clean_csv(tmp_path, text)
+    assert 'façade' in set(df['name'])
+
+
+@pytest.mark.parametrize('text, cleaned', [
+    ('a,,b\n1,2,x\n4,5,y\n7,8,z\n', ['a', 'unnamed_1', 'b']),
+    ('a,a,,b\n1,2,3,x\n4,5,6,y\n7,8,9,z\n', ['a', 'a1', 'unnamed_2', 'b']),
+])
+def test_repeated_and_blank_headers_named_like_pandas(tmp_path, text, cleaned):
+    from utils.simple_cleaner import SimpleDataCleaner
+
+    path = tmp_path / 'input.csv'
+    path.write_text(text, encoding='utf-8')
+    cleaner = SimpleDataCleaner(str(path))
+    assert list(cleaner.df.columns) == list(pd.read_csv(path).columns)
+    cleaner.clean_data()
+    assert list(cleaner.df.columns) == cleaned
+
+
+def test_bloom_dedup_misses_no_duplicates():
+    from utils.simple_cleaner import SimpleDataCleaner
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'a': rng.integers(0, 100_000, 200_000), 'b': rng.integers(0, 2, 200_000)})
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    # Small chunks so most repeats are caught by the filter, not the exact in-chunk check
+    mask = SimpleDataCleaner._approximate_duplicate_mask(hashes, bits_per_row=10, num_hashes=7,
+                                                         chunk_size=1 << 12)
+
+    exact = frame.duplicated().to_numpy()
+    assert not (exact & ~mask).any()
+    # False positives stay under the 1% the docstring promises
+    assert (mask & ~exact).sum() < 0.01 * (~exact).sum()
+
+
+@pytest.mark.parametrize('cleaner_module', ['utils.simple_cleaner', 'utils.data_cleaner'])
+def test_column_with_nulls_and_one_value_is_kept(tmp_path, cleaner_module):
+    df, report = _clean_csv(tmp_path, 'id,flag\n1,\n2,x\n3,x\n', cleaner_module)
+    assert list(df.columns) == ['id', 'flag']
+    assert report['columns_removed'] == 0
+
+
+def _streaming_rows(unique_key):
+    rows = []
+    for i in range(600):
+        key = i if unique_key else i % 150
+        # 'flag' is constant in the first batch only, 'site' everywhere, 'note' is mostly empty
+        score = '' if key % 5 == 0 else f'{key * 1.5}'
+        flag = 'y' if i < 500 else 'n'
+        note = 'seen' if key % 10 == 0 else ''
+        rows.append(f'{key}, name{key % 150} ,{score},{flag},A,{note},{key % 7}')
+    return '\n'.join(['id,name,score,flag,site,note,group'] + rows) + '\n'
+
+
+@pytest.mark.parametrize('unique_key, options', [
+    (False, {}),
+    (False, {'standardize_text': True, 'missing_threshold': 0.95}),
+    (False, {'approximate_duplicates': True}),
+    (True, {'approximate_duplicates': True}),
+])
+def test_streamed_clean_matches_whole_file(tmp_path, monkeypatch, unique_key, options):
+    pytest.importorskip('pyarrow')
+    from utils.simple_cleaner import SimpleDataCleaner
+
+    path = tmp_path / 'input.csv'
+    path.write_text(_streaming_rows(unique_key), encoding='utf-8')
+
+    whole = SimpleDataCleaner(str(path), dict(options))
+    whole_report = whole.clean_data()
+
+    monkeypatch.setattr(SimpleDataCleaner, 'STREAM_BLOCK_SIZE', 1024)
+    streamed = SimpleDataCleaner(str(path), dict(options, stream_threshold=0))
+    # The app rejects empty frames before cleaning, the preview must pass that check
+    assert not streamed.df.empty
+    report = streamed.clean_data()
+
+    assert report['original_rows'] == 600
+    pd.testing.assert_frame_equal(streamed.df, whole.df)
+    for key in ('cleaning_timestamp', 'note'):
+        report.pop(key), whole_report.pop(key)
+    assert report == whole_report
+    assert 'flag' in streamed.df.columns and 'site' not in streamed.df.columns
+
+
+def test_json_response_maps_nan_and_infinity_to_null():
+    payload = {
+        'x': float('nan'),
+        'y': np.float64('inf'),
+        'nested': {'values': [np.float32('nan'), -float('inf'), 1.5], 'array': np.array([np.nan, 2.0])},
+        'missing': (pd.NaT, np.int64(3)),
+    }
+    body = app.json_response(payload, data='[{"a": null}]').get_data(as_text=True)
+
+    def reject(constant):
+        raise ValueError(f'{constant} is not valid JSON')
+
+    assert json.loads(body, parse_constant=reject) == {
+        'x': None,
+        'y': None,
+        'nested': {'values': [None, None, 1.5], 'array': [None, 2.0]},
+        'missing': [None, 3],
+        'data': [{'a': None}],
+    }
+    # The caller's payload is left untouched
+    assert payload['nested']['values'][2] == 1.5 and isinstance(payload['missing'], tuple)
+
+
+def test_fix_csv_issues_repairs_column_counts(tmp_path):
+    from utils import csv_fixer
+
+    path = tmp_path / 'broken.csv'
+    path.write_bytes(b'\xef\xbb\xbfid,name,note\r\n1, "a"  ,x\r\n2,b\r\n3,c,one,two\r\n')
+    fixed = csv_fixer.fix_csv_issues(str(path))
+    try:
+        with open(fixed, 'rb') as f:
+            assert f.read() == b'id,name,note\n1,"a",x\n2,b,\n3,c,"one,two"'
+    finally:
+        os.remove(fixed)
+
+    # The compiled repair, when it builds, must match the pure Python one
+    lines = [b'a,b,c', b' 1,2 ', b'', b'1,2,3,4', b'x']
+    assert csv_fixer._line_fixer()(lines, 2) == csv_fixer._fix_lines(lines, 2)
+
+
+@pytest.mark.parametrize('fast_median', [True, False])
+def test_long_frames_fill_with_approximate_median(monkeypatch, fast_median):
+    pytest.importorskip('pyarrow')
+    from utils.simple_cleaner import SimpleDataCleaner
+
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(size=20000)
+    values[rng.random(20000) < 0.2] = np.nan
+    frame = pd.DataFrame({'value': values, 'id': np.arange(20000)})
+    exact = float(np.nanmedian(values))
+
+    monkeypatch.setattr(SimpleDataCleaner, 'APPROX_MEDIAN_ROWS', 1000)
+    cleaner = SimpleDataCleaner(options={'fast_median': fast_median}, df=frame.copy())
+    cleaner.clean_data()
+
+    filled = cleaner.df['value'][np.isnan(values)].unique()
+    assert len(filled) == 1 and not cleaner.df['value'].isna().any()
+    if fast_median:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        # The t-digest estimate, close to the exact median but not equal to it here
+        assert filled[0] == pc.approximate_median(pa.array(values, from_pandas=True)).as_py()
+        assert filled[0] != exact and abs(filled[0] - exact) / exact < 0.01
+    else:
+        assert filled[0] == exact
+
+
+def test_txt_upload_preview_and_download_find_the_saved_file(client):
+    text = '\n'.join(['id,name,score'] + [f'{i},name{i},{i * 2}' for i in range(10)]) + '\n'
+    response = client.post('/', data={'file': (io.BytesIO(text.encode()), 'notes.txt')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+
+    preview_url = re.search(r'data-preview-url="([^"]+)"', page).group(1)
+    download_url = re.search(r'href="(/download/[^"]+)"', page).group(1)
+    assert preview_url.endswith('.csv') and download_url.endswith('.csv')
+
+    preview = client.get(preview_url)
+    assert preview.status_code == 200
+    assert '<table' in preview.get_data(as_text=True)
+    assert client.get(download_url).status_code == 200
+
+
+def test_async_upload_detects_encoding_from_the_stream(client, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.app.config, 'ASYNC_UPLOAD', True)
+    # The stream head is enough, the saved file is never read back for detection
+    monkeypatch.setattr(app, 'detect_file_encoding', lambda path: pytest.fail('saved file re-read'))
+    encodings = []
+    read = app.read_csv_with_fallbacks
+    monkeypatch.setattr(app, 'read_csv_with_fallbacks',
+                        lambda path, encoding=None: encodings.append(encoding) or read(path, encoding))
+
+    data = '\n'.join(['id,text'] + [f'{i},café crème naïve' for i in range(50)]).encode('latin1') + b'\n'
+    response = client.post('/', data={'file': (io.BytesIO(data), 'latin1.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert encodings and encodings[0].lower() in ('iso-8859-1', 'latin1', 'windows-1252', 'cp1252')
+
+    saved = [p for p in tmp_path.iterdir()
+             if p.name.endswith('_latin1.csv') and not p.name.startswith('cleaned_')]
+    assert len(saved) == 1 and saved[0].read_bytes() == data
+
+
+def test_cleanup_removes_only_expired_uploads(tmp_path):
+    import time
+    from utils.file_handler import FileHandler
+
+    lifetime = app.app.config['FILE_LIFETIME'].total_seconds()
+    now = time.time()
+    ages = {'expired.csv': lifetime + 60, 'fresh.csv': lifetime - 60, 'new.csv': 0}
+    for name, age in ages.items():
+        path = tmp_path / name
+        path.write_text('a\n1\n')
+        os.utime(path, (now - age, now - age))
+
+    FileHandler(str(tmp_path)).cleanup_old_files(lifetime / 3600)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['fresh.csv', 'new.csv']
+
+
+def test_janitor_stays_off_in_tests(client):
+    client.get('/')
+    assert app._janitor is None
+
+
+@pytest.mark.parametrize('has_pyarrow', [False, True])
+def test_generated_dataset_is_reproducible(tmp_path, monkeypatch, capsys, has_pyarrow):
+    import uncleaned_data
+
+    if has_pyarrow:
+        pytest.importorskip('pyarrow')
+    else:
+        monkeypatch.setattr(uncleaned_data, 'pyarrow', None)
+    monkeypatch.chdir(tmp_path)
+
+    df = uncleaned_data.generate_uncleaned_dataset(num_records=200, seed=0)
+    again = uncleaned_data.generate_uncleaned_dataset(num_records=200, seed=0, formats=())
+    pd.testing.assert_frame_equal(df, again)
+
+    written = sorted(os.listdir(tmp_path / 'static' / 'uploads'))
+    assert written == (['uncleaned_dataset.csv', 'uncleaned_dataset.parquet'] if has_pyarrow
+                       else ['uncleaned_dataset.csv'])
+    # The default formats never ask for a file it can't write
+    assert 'skipped' not in capsys.readouterr().out
+
+    # 5% duplicates on top of the records, 16 generated columns plus 3 mostly empty ones
+    assert df.shape == (210, 19)
+    # Repeats differ only in their fresh ID and the column filled in afterwards
+    repeats = df.drop(columns=['Employee_ID', 'Rarely_Used_Column']).duplicated()
+    assert repeats.sum() == 10 and not repeats[:200].any()
+
+    # About 10% of the records lose their age or their phone number, never both
+    original = df[:200]
+    no_age, no_phone = original['Age'].isna(), original['Phone Number'] == ''
+    assert not (no_age & no_phone).any()
+    assert 5 <= (no_age | no_phone).sum() <= 40
+    assert df['Another Empty Column'].isna().all() and (df['Empty_Column'] == '').all()
+    assert df['Rarely_Used_Column'].isna().mean() > 0.5
+
+
+def test_pyarrow_read_matches_c_engine(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'input.csv'
+    path.write_text('id,,when,at,score\n'
+                    '1,a,2023-01-01,12:00:00,1.5\n'
+                    '2,b,2023-01-02,13:30:00,\n'
+                    '3,,2023-02-01,14:00:00,2.5\n', encoding='utf-8')
+
+    monkeypatch.setitem(app.app.config, 'FAST_IO', False)
+    c_engine, _ = app.read_csv_with_fallbacks(str(path), 'utf-8')
+    monkeypatch.setitem(app.app.config, 'FAST_IO', True)
+    arrow, _ = app.read_csv_with_fallbacks(str(path), 'utf-8')
+
+    assert list(arrow.columns) == ['id', 'Unnamed: 1', 'when', 'at', 'score']
+    assert arrow['when'].tolist() == ['2023-01-01', '2023-01-02', '2023-02-01']
+    pd.testing.assert_frame_equal(arrow, c_engine)
+
+
+def test_api_streams_large_csv_uploads(client, monkeypatch):
+    pytest.importorskip('pyarrow')
+    data = _streaming_rows(False).encode()
+
+    def clean(threshold):
+        monkeypatch.setitem(app.app.config, 'STREAM_THRESHOLD', threshold)
+        response = client.post('/api/clean', data={'file': (io.BytesIO(data), 'big.csv')},
+                               content_type='multipart/form-data')
+        assert response.status_code == 200
+        return response.get_json()
+
+    whole = clean(len(data))
+    streamed = clean(len(data) // 2)
+    assert streamed['report']['note'] != whole['report']['note']
+    assert streamed['data'] == whole['data'] and streamed['shape'] == whole['shape']
+
+
+def _engine_rows():
+    rows = []
+    for i in range(300):
+        key = i % 120
+        score = '' if key % 5 == 0 else f'{key * 1.5}'
+        count = '' if key % 7 == 0 else str(key)
+        # One currency cell in the leading rows keeps that text column unstripped
+        text = ' $5 ' if key == 3 else f' t{key} '
+        note = 'seen' if key % 10 == 0 else ''
+        flag = 'true' if key % 2 else 'false'
+        rows.append(f'{key},{text},{score},{count},A,{note},{flag},2023-01-{key % 28 + 1:02d}')
+    return '\n'.join(['id,,score,count,site,note,flag,when'] + rows) + '\n'
+
+
+@pytest.mark.parametrize('options', [{}, {'standardize_text': True}])
+def test_polars_engine_matches_pandas(tmp_path, options):
+    pytest.importorskip('polars')
+    pytest.importorskip('pyarrow')
+    from utils.simple_cleaner import SimpleDataCleaner
+
+    path = tmp_path / 'input.csv'
+    path.write_text(_engine_rows(), encoding='utf-8')
+
+    pandas_cleaner = SimpleDataCleaner(str(path), dict(options))
+    pandas_report = pandas_cleaner.clean_data()
+    polars_cleaner = SimpleDataCleaner(str(path), dict(options, engine='polars'))
+    polars_report = polars_cleaner.clean_data()
+
+    assert polars_report['note'] == 'Simple cleaning applied with polars'
+    pd.testing.assert_frame_equal(polars_cleaner.df, pandas_cleaner.df)
+    for key in ('cleaning_timestamp', 'note'):
+        polars_report.pop(key), pandas_report.pop(key)
+    assert polars_report == pandas_report
+
+
+def test_polars_io_sends_csv_uploads_to_the_polars_engine(client, monkeypatch):
+    pytest.importorskip('polars')
+    pytest.importorskip('pyarrow')
+    monkeypatch.setitem(app.app.config, 'POLARS_IO', True)
+    response = client.post('/api/clean', data={'file': (io.BytesIO(_engine_rows().encode()), 'data.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.get_json()['report']['note'] == 'Simple cleaning applied with polars'
@@ -1,12 +1,51 @@
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-def generate_uncleaned_dataset(num_records=100, output_file='uncleaned_dataset.csv'):
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _write_excel(df, path):
+    """Write an xlsx file, streaming rows with xlsxwriter when it is installed"""
+    if xlsxwriter is None:
+        df.to_excel(path, index=False)
+        return
+    with pd.ExcelWriter(path, engine='xlsxwriter',
+                        engine_kwargs={'options': {'constant_memory': True}}) as writer:
+        df.to_excel(writer, index=False)
+
+def _write_json(df, path):
+    """Write records JSON, encoding with orjson when it is installed"""
+    if orjson is None:
+        df.to_json(path, orient='records', indent=2)
+        return
+    # Zipping column lists is much cheaper than to_dict(orient='records')
+    names = [str(col) for col in df.columns]
+    columns = [df[col].tolist() for col in df.columns]
+    records = [dict(zip(names, row)) for row in zip(*columns)]
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(records, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
+def generate_uncleaned_dataset(num_records=100, output_file='uncleaned_dataset.csv',
+                               formats=None, seed=None):
     """
     Generate a dataset with various data quality issues
+    formats picks the files to write: any of 'csv', 'parquet', 'xlsx', 'json'
+    (default CSV, plus Parquet when pyarrow is installed)
+    seed makes the dataset reproducible; every draw comes from one generator
     """
     
     # Lists for generating random data
@@ -36,124 +75,131 @@ def generate_uncleaned_dataset(num_records=100, output_file='uncleaned_dataset.c
         'special_characters': 0.1  # 10% special chars
     }
     
-    data = []
-    
-    for i in range(1, num_records + 1):
-        # Generate base data
-        first_name = random.choice(first_names)
-        last_name = random.choice(last_names)
-        age = random.randint(22, 65)
-        salary = random.randint(40000, 120000)
-        department = random.choice(departments)
-        city = random.choice(cities)
-        join_date = datetime(2020, 1, 1) + timedelta(days=random.randint(0, 1460))
-        rating = round(random.uniform(2.0, 5.0), 1)
-        phone = f"{random.randint(200, 999)}-{random.randint(100, 999)}-{random.randint(1000, 9999)}"
-        
-        # Apply data issues
-        if random.random() < data_issues['missing_values']:
-            if random.random() < 0.5:
-                age = np.nan
-            else:
-                phone = ''
-        
-        if random.random() < data_issues['extra_spaces']:
-            first_name = f"  {first_name}  "
-            last_name = f"{last_name}  "
-        
-        if random.random() < data_issues['mixed_case']:
-            if random.random() < 0.5:
-                first_name = first_name.upper()
-                last_name = last_name.lower()
-            else:
-                first_name = first_name.title()
-                last_name = last_name.upper()
-        
-        # Email with occasional issues
-        if random.random() < 0.05:
-            email = f"{first_name.lower().strip()}@{last_name.lower().strip()}.com"
-        elif random.random() < 0.02:
-            email = ''
-        else:
-            email = f"{first_name.lower().strip()}.{last_name.lower().strip()}@example.com"
-        
-        # Date format inconsistencies
-        date_formats = [
-            join_date.strftime('%Y-%m-%d'),      # ISO format
-            join_date.strftime('%d/%m/%Y'),      # European
-            join_date.strftime('%m/%d/%Y'),      # US
-            join_date.strftime('%d-%m-%Y'),      # European with dashes
-            join_date.strftime('%m-%d-%Y'),      # US with dashes
-            join_date.strftime('%Y%m%d'),        # Compact
-            join_date.strftime('%B %d, %Y'),     # Full month
-        ]
-        
-        if random.random() < data_issues['date_formats']:
-            join_date_str = random.choice(date_formats[1:])  # Skip ISO format
-        else:
-            join_date_str = date_formats[0]
-        
-        # Salary outliers
-        if random.random() < data_issues['outliers']:
-            salary = random.choice([1000, 5000, 10000, 500000, 1000000])
-        
-        # Comments with special characters
-        comments = []
-        if random.random() < 0.7:
-            comments.append(random.choice([
-                'Good employee',
-                'Needs improvement',
-                'Hard working',
-                'Team player',
-                'Excellent performance',
-                'Average performance',
-                'New hire',
-                'Experienced'
-            ]))
-        
-        if random.random() < data_issues['special_characters']:
-            comments.append(random.choice([
-                'Special@characters#here',
-                'Multiple  spaces',
-                'Line\nbreak',
-                'Tab\tcharacter',
-                'Emoji 😊 included',
-                'UTF-8: café, naïve, résumé'
-            ]))
-        
-        comment = ', '.join(comments) if comments else ''
-        
-        # Create record
-        record = {
-            'Employee_ID': i,
-            'First Name': first_name,
-            'Last Name': last_name,
-            'Full Name': f"{first_name} {last_name}",
-            'Age': age,
-            'Email Address': email,
-            'Salary': salary,
-            'Annual Salary (USD)': salary,
-            'Join Date': join_date_str,
-            'Department': department,
-            'City/Location': city,
-            'Phone Number': phone,
-            'Performance_Rating': rating,
-            'Comments': comment,
-            'Active': random.choice(['Yes', 'No', 'TRUE', 'FALSE', '1', '0', 'Y', 'N']),
-            'Manager': random.choice(['John Smith', 'Jane Doe', 'Robert Johnson', '', 'Not Assigned', 'TBD'])
-        }
-        
-        data.append(record)
-    
-    # Convert to DataFrame
-    df = pd.DataFrame(data)
+    n = num_records
+    rng = np.random.default_rng(seed)
+    
+    # Generate base data, one column at a time
+    first_name = pd.Series(rng.choice(first_names, size=n), dtype=object)
+    last_name = pd.Series(rng.choice(last_names, size=n), dtype=object)
+    age = rng.integers(22, 66, size=n).astype(float)
+    salary = rng.integers(40000, 120001, size=n)
+    department = rng.choice(departments, size=n)
+    city = rng.choice(cities, size=n)
+    join_dates = pd.Timestamp(2020, 1, 1) + pd.to_timedelta(rng.integers(0, 1461, size=n), unit='D')
+    rating = np.round(rng.uniform(2.0, 5.0, size=n), 1)
+    phone = (pd.Series(rng.integers(200, 1000, size=n)).astype(str) + '-' +
+             pd.Series(rng.integers(100, 1000, size=n)).astype(str) + '-' +
+             pd.Series(rng.integers(1000, 10000, size=n)).astype(str))
+    
+    # Draw every per-row decision at once: one uniform column per probability
+    thresholds = np.array([
+        data_issues['missing_values'],      # missing age or phone
+        0.5,                                # ... age rather than phone
+        data_issues['extra_spaces'],
+        data_issues['mixed_case'],
+        0.5,                                # ... upper rather than title case
+        0.05,                               # short email
+        0.02,                               # blank email
+        data_issues['date_formats'],
+        data_issues['outliers'],
+        0.7,                                # regular comment
+        data_issues['special_characters'],
+    ])
+    (missing, missing_age, spaces, mixed, upper_first, short_email, blank_email,
+     odd_date, outliers, has_base, has_special) = (rng.random((n, len(thresholds))) < thresholds).T
+    
+    # Apply data issues
+    age = np.where(missing & missing_age, np.nan, age)
+    phone = phone.mask(missing & ~missing_age, '')
+    
+    first_name = first_name.mask(spaces, '  ' + first_name + '  ')
+    last_name = last_name.mask(spaces, last_name + '  ')
+    
+    upper = mixed & upper_first
+    title = mixed & ~upper_first
+    first_name = first_name.mask(upper, first_name.str.upper()).mask(title, first_name.str.title())
+    last_name = last_name.mask(upper, last_name.str.lower()).mask(title, last_name.str.upper())
+    
+    # Email with occasional issues
+    email_first = first_name.str.lower().str.strip()
+    email_last = last_name.str.lower().str.strip()
+    email = ((email_first + '.' + email_last + '@example.com')
+             .mask(short_email, email_first + '@' + email_last + '.com')
+             .mask(~short_email & blank_email, ''))
+    
+    # Date format inconsistencies
+    date_formats = [
+        '%Y-%m-%d',      # ISO format
+        '%d/%m/%Y',      # European
+        '%m/%d/%Y',      # US
+        '%d-%m-%Y',      # European with dashes
+        '%m-%d-%Y',      # US with dashes
+        '%Y%m%d',        # Compact
+        '%B %d, %Y',     # Full month
+    ]
+    # Skip ISO format for the inconsistent rows
+    fmt_idx = np.where(odd_date, rng.integers(1, len(date_formats), size=n), 0)
+    # Format each row only in its chosen format, one strftime call per format
+    join_date_str = np.empty(n, dtype=object)
+    for k, fmt in enumerate(date_formats):
+        sel = fmt_idx == k
+        if sel.any():
+            join_date_str[sel] = join_dates[sel].strftime(fmt).to_numpy(dtype=object)
+    
+    # Salary outliers
+    salary = np.where(outliers, rng.choice([1000, 5000, 10000, 500000, 1000000], size=n), salary)
+    
+    # Comments with special characters
+    base_comment = pd.Series(rng.choice([
+        'Good employee',
+        'Needs improvement',
+        'Hard working',
+        'Team player',
+        'Excellent performance',
+        'Average performance',
+        'New hire',
+        'Experienced'
+    ], size=n), dtype=object)
+    special_comment = pd.Series(rng.choice([
+        'Special@characters#here',
+        'Multiple  spaces',
+        'Line\nbreak',
+        'Tab\tcharacter',
+        'Emoji 😊 included',
+        'UTF-8: café, naïve, résumé'
+    ], size=n), dtype=object)
+    comment = np.select(
+        [has_base & has_special, has_base, has_special],
+        [base_comment + ', ' + special_comment, base_comment, special_comment],
+        '')
+    
+    # Build the DataFrame once from the column arrays
+    df = pd.DataFrame({
+        'Employee_ID': np.arange(1, n + 1, dtype=np.int32),
+        'First Name': first_name,
+        'Last Name': last_name,
+        'Full Name': first_name + ' ' + last_name,
+        'Age': age,
+        'Email Address': email,
+        'Salary': salary,
+        'Annual Salary (USD)': salary,
+        'Join Date': join_date_str,
+        'Department': department,
+        'City/Location': city,
+        'Phone Number': phone,
+        'Performance_Rating': rating,
+        'Comments': comment,
+        'Active': rng.choice(['Yes', 'No', 'TRUE', 'FALSE', '1', '0', 'Y', 'N'], size=n),
+        'Manager': rng.choice(['John Smith', 'Jane Doe', 'Robert Johnson', '', 'Not Assigned', 'TBD'], size=n)
+    })
     
     # Add duplicate records
     num_duplicates = int(num_records * data_issues['duplicates'])
     if num_duplicates > 0:
-        duplicates = df.sample(n=num_duplicates, replace=True)
-        df = pd.concat([df, duplicates], ignore_index=True)
-        df['Employee_ID'] = range(1, len(df) + 1)
+        # One fancy-index pass instead of sample + concat
+        idx = np.concatenate([np.arange(n), rng.integers(0, n, size=num_duplicates)])
+        df = df.iloc[idx].reset_index(drop=True)
+        df['Employee_ID'] = np.arange(1, len(df) + 1, dtype=np.int32)
     
     # Add some inconsistent column names
     df.rename(columns={
@@ -167,23 +213,44 @@ def generate_uncleaned_dataset(num_records=100, output_file='uncleaned_dataset.c
     
     # Add column with mostly null values (>50%)
     df['Rarely_Used_Column'] = np.nan
-    mask = np.random.rand(len(df)) < 0.3  # Only 30% filled
-    df.loc[mask, 'Rarely_Used_Column'] = random.choices(['A', 'B', 'C'], k=mask.sum())
+    mask = rng.random(len(df)) < 0.3  # Only 30% filled
+    df.loc[mask, 'Rarely_Used_Column'] = rng.choice(['A', 'B', 'C'], size=mask.sum())
     
     # Save to file
     output_path = os.path.join('static', 'uploads', output_file)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    # Save in multiple formats for testing
-    df.to_csv(output_path, index=False)
-    df.to_excel(output_path.replace('.csv', '.xlsx'), index=False)
-    df.to_json(output_path.replace('.csv', '.json'), orient='records', indent=2)
+    # Save in the requested formats, the writes are independent
+    writers = {
+        'csv': ('CSV', lambda path: df.to_csv(path, index=False)),
+        'parquet': ('Parquet', lambda path: df.to_parquet(path, index=False)),
+        'xlsx': ('Excel', lambda path: _write_excel(df, path)),
+        'json': ('JSON', lambda path: _write_json(df, path)),
+    }
+    base_path = os.path.splitext(output_path)[0]
+    if formats is None:
+        formats = ('csv', 'parquet') if pyarrow is not None else ('csv',)
+    saved = []
+    with ThreadPoolExecutor(max_workers=len(writers)) as executor:
+        futures = []
+        for fmt in formats:
+            if fmt not in writers:
+                print(f"✗ Unknown format skipped: {fmt}")
+                continue
+            if fmt == 'parquet' and pyarrow is None:
+                print("✗ Parquet skipped: pyarrow is not installed")
+                continue
+            label, write = writers[fmt]
+            path = f"{base_path}.{fmt}"
+            futures.append(executor.submit(write, path))
+            saved.append((label, path))
+        for future in futures:
+            future.result()
     
     print(f"Generated {len(df)} records with data quality issues")
     print(f"Files saved:")
-    print(f"  - CSV: {output_path}")
-    print(f"  - Excel: {output_path.replace('.csv', '.xlsx')}")
-    print(f"  - JSON: {output_path.replace('.csv', '.json')}")
+    for label, path in saved:
+        print(f"  - {label}: {path}")
     
     # Print data quality issues summary
     print("\nData Quality Issues Included:")
@@ -0,0 +1,55 @@
+# cython: language_level=3
+"""Compiled column-count repair for csv_fixer.fix_csv_issues"""
+from libc.string cimport memchr
+
+
+cdef Py_ssize_t _count_commas(const char *buf, Py_ssize_t n):
+    cdef Py_ssize_t count = 0
+    cdef const char *p = buf
+    cdef const char *end = buf + n
+    while p < end:
+        p = <const char *>memchr(p, 44, end - p)
+        if p == NULL:
+            break
+        count += 1
+        p += 1
+    return count
+
+
+cdef Py_ssize_t _nth_comma(const char *buf, Py_ssize_t n, Py_ssize_t nth):
+    """Offset of the nth (1-based) comma in buf"""
+    cdef const char *p = buf
+    cdef const char *end = buf + n
+    while True:
+        p = <const char *>memchr(p, 44, end - p)
+        nth -= 1
+        if nth == 0:
+            return p - buf
+        p += 1
+
+
+cpdef list fix_lines(list lines, Py_ssize_t expected_commas):
+    """Pad short lines with commas and quote the overflow of long ones"""
+    cdef list fixed = []
+    cdef bytes line
+    cdef const char *buf
+    cdef Py_ssize_t n, count, cut
+    for raw in lines:
+        line = raw.strip()
+        n = len(line)
+        if n == 0:
+            continue
+        buf = line
+        count = _count_commas(buf, n)
+        if count > expected_commas:
+            # Join extra parts into the last field
+            if expected_commas == 0:
+                line = b',"' + line + b'"'
+            else:
+                cut = _nth_comma(buf, n, expected_commas)
+                line = line[:cut] + b',"' + line[cut + 1:] + b'"'
+        elif count < expected_commas:
+            # Add missing empty fields
+            line = line + b',' * (expected_commas - count)
+        fixed.append(line)
+    return fixed
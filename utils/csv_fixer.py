@@ -4,63 +4,190 @@ import re
 import tempfile
 import os
 import io
+import mmap
+import numpy as np
 
-def fix_csv_issues(filepath):
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _scan_fields(buf):
     """
-    Fix all CSV issues and return path to fixed file
+    Find the comma-separated fields of one line, ignoring commas in quotes
+    buf is the line as a uint8 array; returns (starts, ends) byte offsets
     """
-    # Read the raw file content
-    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-    
-    # Fix 1: Handle line endings
-    content = content.replace('\r\n', '\n').replace('\r', '\n')
-    
-    # Fix 2: Remove BOM if present
-    if content.startswith('\ufeff'):
-        content = content[1:]
-    
-    # Fix 3: Fix the specific issue with spaces around quotes
-    # Pattern: comma, spaces, quote
-    content = re.sub(r',\s+"', ',"', content)
-    # Pattern: quote, spaces, comma or end of line
-    content = re.sub(r'"\s+,', '",', content)
-    content = re.sub(r'"\s*$', '"', content)
-    
-    # Fix 4: Ensure consistent number of columns
-    lines = content.strip().split('\n')
-    
-    # Count commas in header
-    header = lines[0] if lines else ''
-    expected_commas = header.count(',')
+    n = len(buf)
+    starts = np.empty(n + 1, np.int32)
+    ends = np.empty(n + 1, np.int32)
+    count = 0
+    start = 0
+    in_quotes = False
+    for i in range(n):
+        c = buf[i]
+        if c == 34:  # '"'
+            in_quotes = not in_quotes
+        elif c == 44 and not in_quotes:  # ','
+            starts[count] = start
+            ends[count] = i
+            count += 1
+            start = i + 1
+    # Add last field
+    if start < n:
+        starts[count] = start
+        ends[count] = n
+        count += 1
+    return starts[:count], ends[:count]
+
+if njit is not None:
+    _scan_fields = njit(cache=True)(_scan_fields)
+    # Compile up front so the first fallback parse doesn't pay for it
+    _scan_fields(np.frombuffer(b'a,"b,c"', dtype=np.uint8))
+
+def _normalize_kernel(buf, out):
+    """
+    Strip a UTF-8 BOM, turn CRLF/CR into LF and drop whitespace in
+    ',<spaces>"', '"<spaces>,' and a trailing '"<spaces>' in one pass
+    buf is the raw file as uint8; returns the number of bytes written to out
+    """
+    n = len(buf)
+    i = 0
+    k = 0
+    if n >= 3 and buf[0] == 0xEF and buf[1] == 0xBB and buf[2] == 0xBF:
+        i = 3
+    while i < n:
+        c = buf[i]
+        if c == 13:  # '\r'
+            out[k] = 10
+            k += 1
+            i += 1
+            if i < n and buf[i] == 10:
+                i += 1
+            continue
+        out[k] = c
+        k += 1
+        if c == 44 or c == 34:  # ',' or '"'
+            # Same whitespace set as re's \s, ASCII part
+            j = i + 1
+            while j < n and (buf[j] == 32 or 9 <= buf[j] <= 13 or 28 <= buf[j] <= 31):
+                j += 1
+            if j > i + 1:
+                if c == 44 and j < n and buf[j] == 34:
+                    i = j
+                    continue
+                if c == 34 and (j == n or buf[j] == 44):
+                    i = j
+                    continue
+        i += 1
+    return k
+
+_BYTES_SPACE = rb'[ \t\n\r\x0b\x0c\x1c-\x1f]'
+_COMMA_SPACE_QUOTE = re.compile(rb',' + _BYTES_SPACE + rb'+"')
+_QUOTE_SPACE_COMMA = re.compile(rb'"' + _BYTES_SPACE + rb'+,')
+_QUOTE_SPACE_END = re.compile(rb'"' + _BYTES_SPACE + rb'*\Z')
+
+def _normalize_csv_bytes(raw):
+    """Apply the line ending, BOM and quote-spacing fixes to raw CSV bytes (or an mmap)"""
+    if njit is not None:
+        out = np.empty(len(raw), dtype=np.uint8)
+        k = _normalize_kernel(np.frombuffer(raw, dtype=np.uint8), out)
+        return out[:k].tobytes()
     
+    # Without numba, fall back to the equivalent byte regexes
+    start = 3 if raw[:3] == b'\xef\xbb\xbf' else 0
+    raw = raw[start:].replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    raw = _COMMA_SPACE_QUOTE.sub(b',"', raw)
+    raw = _QUOTE_SPACE_COMMA.sub(b'",', raw)
+    return _QUOTE_SPACE_END.sub(b'"', raw)
+
+if njit is not None:
+    _normalize_kernel = njit(cache=True)(_normalize_kernel)
+    _normalize_kernel(np.frombuffer(b'\xef\xbb\xbfa, "b"  ,\r\n', dtype=np.uint8),
+                      np.empty(16, dtype=np.uint8))
+
+def _fix_lines(lines, expected_commas):
+    """Pad short lines with commas and quote the overflow of long ones"""
     fixed_lines = []
-    for i, line in enumerate(lines):
+    for line in lines:
         line = line.strip()
         if not line:
             continue
             
-        comma_count = line.count(',')
+        comma_count = line.count(b',')
         
         if comma_count > expected_commas:
             # Too many commas - likely unquoted commas in text
-            # Find and quote fields that might have commas
-            parts = line.split(',')
-            if len(parts) > expected_commas + 1:
-                # Join extra parts into the last field
-                line = ','.join(parts[:expected_commas]) + ',"' + ','.join(parts[expected_commas:]) + '"'
+            # Join extra parts into the last field
+            parts = line.split(b',')
+            line = b','.join(parts[:expected_commas]) + b',"' + b','.join(parts[expected_commas:]) + b'"'
         elif comma_count < expected_commas:
             # Add missing empty fields
-            line += ',' * (expected_commas - comma_count)
+            line += b',' * (expected_commas - comma_count)
         
         fixed_lines.append(line)
+    return fixed_lines
+
+_compiled_fix_lines = None
+
+def _line_fixer():
+    """The Cython line repair when it is built or buildable, else _fix_lines"""
+    global _compiled_fix_lines
+    if _compiled_fix_lines is not None:
+        return _compiled_fix_lines
+    
+    try:
+        # Prebuilt with: cythonize -i utils/csv_fix.pyx
+        from utils.csv_fix import fix_lines
+    except ImportError:
+        try:
+            import pyximport
+        except ImportError:
+            fix_lines = _fix_lines
+        else:
+            # Hook the import system only for as long as this one build takes
+            importers = pyximport.install(language_level=3)
+            try:
+                from utils.csv_fix import fix_lines
+            except Exception:
+                fix_lines = _fix_lines
+            finally:
+                pyximport.uninstall(*importers)
+    
+    _compiled_fix_lines = fix_lines
+    return fix_lines
+
+def fix_csv_issues(filepath):
+    """
+    Fix all CSV issues and return path to fixed file
+    """
+    # Fixes 1-3: line endings, BOM and spaces around quotes, in one pass
+    # straight over a map of the file rather than a copy of it
+    if os.path.getsize(filepath) == 0:
+        normalized = b''
+    else:
+        with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            normalized = _normalize_csv_bytes(mm)
+    if not normalized.isascii():
+        # Drop invalid UTF-8 sequences, as the old text-mode read did
+        normalized = normalized.decode('utf-8', errors='ignore').encode('utf-8')
+    
+    # Fix 4: Ensure consistent number of columns
+    lines = normalized.strip().split(b'\n')
     
-    # Create temp file with fixed content
-    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv', encoding='utf-8')
-    temp_path = temp_file.name
+    # Count commas in header
+    header = lines[0] if lines else b''
+    expected_commas = header.count(b',')
+    
+    fixed_lines = _line_fixer()(lines, expected_commas)
     
-    with open(temp_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(fixed_lines))
+    # Create temp file with fixed content, written as one buffer
+    fd, temp_path = tempfile.mkstemp(suffix='.csv')
+    try:
+        buf = memoryview(b'\n'.join(fixed_lines))
+        while buf:
+            buf = buf[os.write(fd, buf):]
+    finally:
+        os.close(fd)
     
     return temp_path
 
@@ -117,23 +244,10 @@ def manual_csv_parse(filepath):
             rows.append(row)
         except:
             # Fallback: split by comma, ignoring commas in quotes
-            in_quotes = False
-            fields = []
-            current_field = []
-            
-            for char in line:
-                if char == '"':
-                    in_quotes = not in_quotes
-                    current_field.append(char)
-                elif char == ',' and not in_quotes:
-                    fields.append(''.join(current_field).strip('"').strip())
-                    current_field = []
-                else:
-                    current_field.append(char)
-            
-            # Add last field
-            if current_field:
-                fields.append(''.join(current_field).strip('"').strip())
+            raw = line.encode('utf-8')
+            starts, ends = _scan_fields(np.frombuffer(raw, dtype=np.uint8))
+            fields = [raw[start:end].decode('utf-8').strip('"').strip()
+                      for start, end in zip(starts.tolist(), ends.tolist())]
             
             rows.append(fields)
     
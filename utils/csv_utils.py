@@ -2,6 +2,11 @@
 import pandas as pd
 import numpy as np
 import csv
+import os
+import mmap
+import codecs
+from functools import lru_cache
+from itertools import zip_longest
 
 try:
     import chardet
@@ -10,24 +15,135 @@ except ImportError:
     import warnings
     warnings.warn("Optional dependency 'chardet' is not installed; falling back to 'utf-8' for encoding detection.", ImportWarning)
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pacsv = None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+def read_csv_polars(filepath, encoding='utf-8'):
+    """Read a CSV with Polars' parallel parser, nulling cells it cannot parse"""
+    if pl is None:
+        raise ImportError("polars is not installed")
+    if (encoding or 'utf-8').lower().replace('-', '') in ('utf8', 'ascii'):
+        encoding = 'utf8'
+    return pl.read_csv(filepath, encoding=encoding, ignore_errors=True).to_pandas()
+
+def pandas_header(names):
+    """Name columns as pd.read_csv does: 'Unnamed: i' for blanks, 'a.1' for repeats"""
+    names = [name if name else f'Unnamed: {i}' for i, name in enumerate(names)]
+    counts = {}
+    for i, name in enumerate(names):
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f'{name}.{count}'
+            count = counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+def _arrow_text_dates(read_options, schema, include_columns=()):
+    """
+    Options to read a CSV again with pandas' header names and its date and time
+    columns as text, since pd.read_csv leaves those as strings; None if none were inferred
+    """
+    temporal = [i for i, field in enumerate(schema) if pa.types.is_temporal(field.type)]
+    if not temporal:
+        return None
+    
+    if read_options.column_names:
+        # The caller named the columns already, and schema may only hold some of them
+        names = schema.names
+    else:
+        names = pandas_header(schema.names)
+        read_options = pacsv.ReadOptions(encoding=read_options.encoding, block_size=read_options.block_size,
+                                         skip_rows=read_options.skip_rows + 1, column_names=names)
+    convert_options = pacsv.ConvertOptions(strings_can_be_null=True, include_columns=include_columns,
+                                           column_types={names[i]: pa.string() for i in temporal})
+    return read_options, convert_options
+
+def read_csv_arrow(filepath, read_options, parse_options=None, include_columns=()):
+    """
+    pyarrow read_csv into a DataFrame with the columns and dtypes pd.read_csv would give
+    include_columns needs read_options.column_names, since header names can repeat
+    """
+    # Treat empty strings as missing, like pandas does
+    convert_options = pacsv.ConvertOptions(strings_can_be_null=True, include_columns=include_columns)
+    table = pacsv.read_csv(filepath, read_options=read_options, parse_options=parse_options,
+                           convert_options=convert_options)
+    text_dates = _arrow_text_dates(read_options, table.schema, include_columns)
+    if text_dates is not None:
+        # Re-read rather than format the parsed values, which would not give back the original text
+        table = pacsv.read_csv(filepath, read_options=text_dates[0], parse_options=parse_options,
+                               convert_options=text_dates[1])
+    # to_pandas refuses repeated names, so rename before converting
+    table = table.rename_columns(pandas_header(table.column_names))
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def open_csv_arrow(filepath, read_options, parse_options=None):
+    """Batched pyarrow reader with the same date handling as read_csv_arrow"""
+    convert_options = pacsv.ConvertOptions(strings_can_be_null=True)
+    reader = pacsv.open_csv(filepath, read_options=read_options, parse_options=parse_options,
+                            convert_options=convert_options)
+    text_dates = _arrow_text_dates(read_options, reader.schema)
+    if text_dates is not None:
+        reader = pacsv.open_csv(filepath, read_options=text_dates[0], parse_options=parse_options,
+                                convert_options=text_dates[1])
+    return reader
+
+def read_csv_fast(filepath, encoding='utf-8'):
+    """Read a well-formed CSV with pyarrow's multithreaded reader"""
+    if pacsv is None:
+        raise ImportError("pyarrow is not installed")
+    return read_csv_arrow(filepath, pacsv.ReadOptions(encoding=encoding))
+
 def detect_encoding(filepath):
-    """Detect file encoding"""
+    """Detect file encoding, reusing the result while the file is unchanged"""
     if chardet is None:
         # Best-effort fallback
         return 'utf-8'
-    with open(filepath, 'rb') as f:
-        raw_data = f.read(10000)  # Read first 10KB
-        result = chardet.detect(raw_data)
-        return result['encoding']
+    stat = os.stat(filepath)
+    return _detect_encoding_cached(filepath, stat.st_mtime, stat.st_size)
+
+@lru_cache(maxsize=128)
+def _detect_encoding_cached(filepath, mtime, size):
+    """Run chardet over the first 10KB; mtime and size only key the cache"""
+    if size == 0:
+        # mmap cannot map an empty file
+        return chardet.detect(b'')['encoding']
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        raw_data = mm[:10000]  # Read first 10KB
+    
+    # Most uploads are plain UTF-8, which needs no chardet pass. NUL bytes
+    # point at UTF-16/32 and a BOM needs utf-8-sig, so leave those to chardet
+    if b'\x00' not in raw_data and not raw_data.startswith(codecs.BOM_UTF8):
+        if raw_data.isascii():
+            return 'utf-8'
+        try:
+            # final=False tolerates a multibyte character cut off by the 10KB limit
+            codecs.utf_8_decode(raw_data, 'strict', False)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+    
+    result = chardet.detect(raw_data)
+    return result['encoding']
 
 # ...existing code...
-def smart_read_csv(filepath, encoding=None):
+def smart_read_csv(filepath, encoding=None, use_polars=False):
     """
     Smart CSV reader that handles various issues:
     - Inconsistent number of columns
     - Commas in text fields
     - Different encodings
     - Line breaks in cells
+    use_polars tries Polars before anything else, worth it for very large files
     """
     
     if encoding is None:
@@ -36,18 +152,26 @@ def smart_read_csv(filepath, encoding=None):
     
     # Multiple read attempts with different strategies
     strategies = [
-        # Strategy 1: Standard read
-        lambda: pd.read_csv(filepath, encoding=encoding),
+        # Standard read with the C engine
+        lambda: pd.read_csv(filepath, encoding=encoding, engine='c', low_memory=False),
         
-        # Strategy 2: Skip bad lines
+        # Skip bad lines, still in C
+        lambda: pd.read_csv(filepath, encoding=encoding, on_bad_lines='skip', engine='c'),
+        
+        # Skip bad lines with the python engine
         lambda: pd.read_csv(filepath, encoding=encoding, on_bad_lines='skip', engine='python'),
         
-        # Strategy 3: Warn on bad lines
+        # Warn on bad lines
         lambda: pd.read_csv(filepath, encoding=encoding, on_bad_lines='warn', engine='python'),
         
-        # Strategy 4: Manual parsing
+        # Manual parsing
         lambda: manual_csv_parse(filepath, encoding),
     ]
+    if pacsv is not None:
+        # Fastest path first when pyarrow is installed
+        strategies.insert(0, lambda: read_csv_fast(filepath, encoding))
+    if use_polars and pl is not None:
+        strategies.insert(0, lambda: read_csv_polars(filepath, encoding))
     
     for i, strategy in enumerate(strategies):
         try:
@@ -61,6 +185,20 @@ def smart_read_csv(filepath, encoding=None):
     
     raise ValueError("All CSV reading strategies failed")
 
+def rows_to_frame(rows):
+    """
+    Build a DataFrame from parsed rows, the first row being the header
+    Rows are transposed (short ones padded with '') in one zip_longest pass,
+    so pandas gets whole columns instead of transposing a list of rows itself
+    """
+    columns = list(zip_longest(*rows, fillvalue=''))
+    # Positional keys, header names may repeat
+    df = pd.DataFrame({i: col[1:] for i, col in enumerate(columns)})
+    df.columns = [col[0] for col in columns]
+    return df
+
+_QUOTED_COMMA = str.maketrans(',', '\x01')
+
 def manual_csv_parse(filepath, encoding='utf-8'):
     """Manually parse CSV file"""
     rows = []
@@ -70,17 +208,13 @@ def manual_csv_parse(filepath, encoding='utf-8'):
         content = f.read()
         
         # Replace problematic patterns
-        # Handle quoted fields with commas
-        import re
-        
-        # Pattern to match quoted text
-        quoted_pattern = r'"[^"]*"'
-        
-        # Temporarily replace commas inside quotes
-        def replace_commas(match):
-            return match.group(0).replace(',', '||COMMA||')
-        
-        content = re.sub(quoted_pattern, replace_commas, content)
+        # Temporarily swap commas inside quotes for a placeholder byte;
+        # odd segments sit between a pair of quotes, an unmatched last quote is left alone
+        parts = content.split('"')
+        last = len(parts) - 1 if len(parts) % 2 == 0 else len(parts)
+        for i in range(1, last, 2):
+            parts[i] = parts[i].translate(_QUOTED_COMMA)
+        content = '"'.join(parts)
         
         # Now split by lines and commas
         lines = content.strip().split('\n')
@@ -104,7 +238,7 @@ def manual_csv_parse(filepath, encoding='utf-8'):
                 cols = cols[:max_cols-1] + [','.join(cols[max_cols-1:])]
             
             # Restore commas inside quotes
-            cols = [col.replace('||COMMA||', ',') for col in cols]
+            cols = [col.replace('\x01', ',') for col in cols]
             
             # Remove quotes if present
             cols = [col.strip('"') for col in cols]
@@ -113,7 +247,7 @@ def manual_csv_parse(filepath, encoding='utf-8'):
     
     # Create DataFrame
     if rows:
-        df = pd.DataFrame(rows[1:], columns=rows[0])
+        df = rows_to_frame(rows)
     else:
         df = pd.DataFrame()
     
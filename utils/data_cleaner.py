@@ -1,7 +1,7 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import chardet
+from utils.csv_utils import detect_encoding, pacsv, read_csv_fast, rows_to_frame
 
 class SimpleDataCleaner:
     def __init__(self, filepath, options=None):
@@ -22,12 +22,16 @@ class SimpleDataCleaner:
             
             # Try multiple reading strategies
             strategies = [
+                lambda: pd.read_csv(self.filepath, encoding=encoding, engine='c', low_memory=False),
+                lambda: pd.read_csv(self.filepath, encoding=encoding, on_bad_lines='skip', engine='c'),
                 lambda: pd.read_csv(self.filepath, encoding=encoding, on_bad_lines='skip', engine='python'),
                 lambda: pd.read_csv(self.filepath, encoding='utf-8', on_bad_lines='skip', engine='python'),
                 lambda: pd.read_csv(self.filepath, encoding='latin1', on_bad_lines='skip', engine='python'),
                 lambda: pd.read_csv(self.filepath, encoding='cp1252', on_bad_lines='skip', engine='python'),
                 lambda: self._manual_csv_read(self.filepath),
             ]
+            if pacsv is not None:
+                strategies.insert(0, lambda: read_csv_fast(self.filepath, encoding))
             
             for i, strategy in enumerate(strategies, 1):
                 try:
@@ -63,12 +67,9 @@ class SimpleDataCleaner:
     def _detect_encoding(self):
         """Detect file encoding"""
         try:
-            with open(self.filepath, 'rb') as f:
-                raw_data = f.read(10000)
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-                print(f"Detected encoding: {encoding} (confidence: {result['confidence']})")
-                return encoding
+            encoding = detect_encoding(self.filepath)
+            print(f"Detected encoding: {encoding}")
+            return encoding
         except:
             return 'utf-8'
     
@@ -90,15 +91,8 @@ class SimpleDataCleaner:
                 continue
         
         if rows:
-            # Find max columns
-            max_cols = max(len(row) for row in rows)
-            
-            # Pad rows
-            for i in range(len(rows)):
-                if len(rows[i]) < max_cols:
-                    rows[i].extend([''] * (max_cols - len(rows[i])))
-            
-            df = pd.DataFrame(rows[1:], columns=rows[0])
+            # Pads short rows while building column by column
+            df = rows_to_frame(rows)
         else:
             df = pd.DataFrame()
         
@@ -109,32 +103,40 @@ class SimpleDataCleaner:
         original_rows = self.original_shape[0]
         original_cols = self.original_shape[1]
         
-        # 1. Drop columns with too many missing values
+        # 1. Drop columns with too many missing values, or a single distinct value
         threshold = self.options.get('missing_threshold', 0.5)
-        missing_percent = self.df.isnull().sum() / len(self.df)
-        cols_to_drop = missing_percent[missing_percent > threshold].index.tolist()
-        if cols_to_drop:
-            self.df = self.df.drop(columns=cols_to_drop)
-        
-        # 2. Fill missing values
+        drop_mask = self.df.isna().mean() > threshold
+        if len(self.df) > 1:
+            # With one row every column would look constant
+            constant = self.df.nunique(dropna=False) <= 1
+            # A frame that is constant all the way across is still the data, keep it
+            if not (drop_mask | constant).all():
+                drop_mask |= constant
+        cols_to_drop = self.df.columns[drop_mask.to_numpy()]
+        if len(cols_to_drop):
+            self.df.drop(columns=cols_to_drop, inplace=True)
+        
+        # 2. Fill missing values, one fillna call for every affected column
         method = self.options.get('handle_missing', 'auto')
-        for col in self.df.columns:
-            if self.df[col].isnull().any():
-                if method == 'mean' and pd.api.types.is_numeric_dtype(self.df[col]):
-                    self.df[col] = self.df[col].fillna(self.df[col].mean())
-                elif method == 'median' and pd.api.types.is_numeric_dtype(self.df[col]):
-                    self.df[col] = self.df[col].fillna(self.df[col].median())
-                elif method == 'mode':
-                    mode_val = self.df[col].mode()
-                    if not mode_val.empty:
-                        self.df[col] = self.df[col].fillna(mode_val.iloc[0])
-                    else:
-                        self.df[col] = self.df[col].fillna('Unknown')
-                else:  # auto or default
-                    if pd.api.types.is_numeric_dtype(self.df[col]):
-                        self.df[col] = self.df[col].fillna(self.df[col].median())
-                    else:
-                        self.df[col] = self.df[col].fillna('Unknown')
+        missing_cols = self.df.columns[self.df.isna().any().to_numpy()]
+        if len(missing_cols):
+            if method == 'mode':
+                modes = self.df[missing_cols].mode()
+                if len(modes):
+                    fill_values = modes.iloc[0].to_dict()
+                else:
+                    fill_values = {}
+                # Columns without a mode (all missing) get the placeholder
+                fill_values = {col: 'Unknown' if pd.isna(fill_values.get(col, np.nan)) else fill_values[col]
+                               for col in missing_cols}
+            else:
+                # Dtype checks once per column, without slicing out a sub-frame
+                is_num = {col: pd.api.types.is_numeric_dtype(dtype) for col, dtype in self.df.dtypes.items()}
+                num_cols = [col for col in missing_cols if is_num[col]]
+                stat = 'mean' if method == 'mean' else 'median'  # median for auto or default
+                fill_values = {col: 'Unknown' for col in missing_cols if not is_num[col]}
+                fill_values.update(self.df[num_cols].agg(stat).to_dict())
+            self.df = self.df.fillna(fill_values)
         
         # 3. Remove duplicates (only if explicitly requested)
         if self.options.get('handle_duplicates', 'drop') == 'drop':
@@ -146,10 +148,17 @@ class SimpleDataCleaner:
         # 4. Standardize text if requested (but skip for certain data types)
         if self.options.get('standardize_text'):
             text_cols = self.df.select_dtypes(include=['object']).columns
-            for col in text_cols:
+            if len(text_cols):
                 # Don't lowercase currency or special data
-                if 'gross' not in col.lower() and '$' not in str(self.df[col].iloc[0] if not self.df[col].empty else ''):
-                    self.df[col] = self.df[col].astype(str).str.strip()
+                if len(self.df):
+                    first_values = self.df[text_cols].iloc[0].astype(str).to_numpy()
+                else:
+                    first_values = np.array([''] * len(text_cols), dtype=object)
+                skip = (np.asarray(text_cols.str.lower().str.contains('gross', regex=False))
+                        | pd.Series(first_values).str.contains('$', regex=False).to_numpy())
+                strip_cols = text_cols[~skip]
+                if len(strip_cols):
+                    self.df[strip_cols] = self.df[strip_cols].astype(str).apply(lambda s: s.str.strip())
         
         # 5. Standardize column names (but keep them readable)
         new_columns = []
@@ -1,13 +1,17 @@
 import os
 import pandas as pd
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 import shutil
+import time
 import csv
+from utils.csv_utils import detect_encoding, pacsv, pl, read_csv_fast, read_csv_polars, rows_to_frame
 
 class FileHandler:
-    def __init__(self, upload_folder):
+    def __init__(self, upload_folder, use_polars=False):
         self.upload_folder = upload_folder
+        # Opt-in Polars backend for CSV reads and writes, when installed
+        self.use_polars = use_polars and pl is not None
         if not os.path.exists(upload_folder):
             os.makedirs(upload_folder)
     
@@ -33,15 +37,35 @@ class FileHandler:
             # Try as CSV
             return self._safe_read_csv(filepath)
     
+    def load_head(self, filepath, nrows=10):
+        """Load only the first nrows of a saved file"""
+        ext = os.path.splitext(filepath)[1].lower()
+        
+        if ext in ['.xlsx', '.xls']:
+            return pd.read_excel(filepath, nrows=nrows)
+        elif ext == '.json':
+            return pd.read_json(filepath).head(nrows)
+        else:
+            # Cleaned CSV and TXT files are both written as CSV
+            return pd.read_csv(filepath, nrows=nrows)
+    
     def _safe_read_csv(self, filepath):
         """Safely read CSV file with multiple fallbacks"""
         strategies = [
-            lambda: pd.read_csv(filepath, encoding='utf-8'),
-            lambda: pd.read_csv(filepath, encoding='latin1'),
+            lambda: pd.read_csv(filepath, encoding='utf-8', engine='c', low_memory=False),
+            lambda: pd.read_csv(filepath, encoding='latin1', engine='c', low_memory=False),
+            lambda: pd.read_csv(filepath, encoding='utf-8', on_bad_lines='skip', engine='c'),
             lambda: pd.read_csv(filepath, encoding='utf-8', on_bad_lines='skip', engine='python'),
             lambda: pd.read_csv(filepath, encoding='latin1', on_bad_lines='skip', engine='python'),
             lambda: self._manual_csv_read(filepath),
         ]
+        if pacsv is not None or self.use_polars:
+            # Neither has a latin1 retry of its own, so give them the detected encoding
+            encoding = detect_encoding(filepath) or 'utf-8'
+        if pacsv is not None:
+            strategies.insert(0, lambda: read_csv_fast(filepath, encoding))
+        if self.use_polars:
+            strategies.insert(0, lambda: read_csv_polars(filepath, encoding))
         
         for strategy in strategies:
             try:
@@ -61,25 +85,20 @@ class FileHandler:
                 rows.append(row)
         
         if len(rows) > 1:
-            # Pad rows to same length
-            max_len = max(len(row) for row in rows)
-            for row in rows:
-                if len(row) < max_len:
-                    row.extend([''] * (max_len - len(row)))
-            
-            df = pd.DataFrame(rows[1:], columns=rows[0])
+            # Pads short rows while building column by column
+            df = rows_to_frame(rows)
         else:
             df = pd.DataFrame()
         
         return df
     
     def save_cleaned_data(self, df, filename):
-        """Save cleaned data to file"""
+        """Save cleaned data to file and return its path, which may end in .csv instead"""
         filepath = os.path.join(self.upload_folder, filename)
         ext = os.path.splitext(filename)[1].lower()
         
         if ext == '.csv':
-            df.to_csv(filepath, index=False)
+            self._write_csv(df, filepath)
         elif ext in ['.xlsx', '.xls']:
             df.to_excel(filepath, index=False)
         elif ext == '.json':
@@ -87,10 +106,21 @@ class FileHandler:
         else:
             # Default to CSV
             filepath = filepath.rsplit('.', 1)[0] + '.csv'
-            df.to_csv(filepath, index=False)
+            self._write_csv(df, filepath)
         
         return filepath
     
+    def _write_csv(self, df, filepath):
+        """Write CSV with Polars when enabled, falling back to pandas"""
+        if self.use_polars:
+            try:
+                pl.from_pandas(df).write_csv(filepath)
+                return
+            except Exception as e:
+                # Mixed-type object columns cannot become Arrow arrays
+                print(f"Polars write failed, using pandas: {str(e)[:100]}")
+        df.to_csv(filepath, index=False)
+    
     def save_cleaning_report(self, report, filename):
         """Save cleaning report as JSON"""
         filepath = os.path.join(self.upload_folder, filename)
@@ -112,16 +142,13 @@ class FileHandler:
     
     def cleanup_old_files(self, max_age_hours=1):
         """Clean up files older than max_age_hours"""
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+        cutoff_ts = time.time() - max_age_hours * 3600
         
-        for filename in os.listdir(self.upload_folder):
-            filepath = os.path.join(self.upload_folder, filename)
-            
-            if os.path.isfile(filepath):
-                file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-                
-                if file_time < cutoff_time:
+        # DirEntry carries the file type and stat from the directory read
+        with os.scandir(self.upload_folder) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff_ts:
                     try:
-                        os.remove(filepath)
+                        os.unlink(entry.path)
                     except:
                         pass  # Skip files that can't be deleted
\ No newline at end of file
@@ -1,21 +1,128 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import chardet
+import logging
+import re
+from collections import Counter
 import csv
+from itertools import chain
 import os
+from utils.csv_utils import detect_encoding, open_csv_arrow, pandas_header, read_csv_arrow, rows_to_frame
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    _STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    pacsv = None
+    _STRING_DTYPE = None
+
+try:
+    from joblib import Parallel, delayed
+except ImportError:
+    Parallel = None
+
+logger = logging.getLogger(__name__)
+
+# Column-name cleanup patterns, compiled once
+_RE_SPECIAL = re.compile(r'[^\w\s]')
+_RE_SPACE = re.compile(r'\s+')
+# ASCII names skip the regex engine: delete everything that isn't \w or \s
+_ASCII_SPECIAL = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if not (c.isalnum() or c == '_' or c.isspace())))
 
 class SimpleDataCleaner:
-    def __init__(self, filepath, options=None):
+    # CSVs above this size are cleaned batch by batch instead of loaded whole
+    STREAM_THRESHOLD = 256 * 1024 * 1024
+    STREAM_BLOCK_SIZE = 16 << 20
+    # Frames with at least this many numeric columns to fill get threaded medians
+    PARALLEL_MEDIAN_COLUMNS = 32
+    # Frames this long fill numeric gaps with Arrow's t-digest median estimate
+    APPROX_MEDIAN_ROWS = 1_000_000
+    _DELIMITER_BYTES = b',;\t|'
+    # Text with any '$' or a leading '[' looks like currency or lists, leave it alone
+    _SPECIAL_TEXT = r'.*\$|\['
+    
+    def __init__(self, filepath=None, options=None, df=None):
         self.filepath = filepath
         self.options = options or {}
         self.df = None
         self.report = {}
-        self._load_data()
+        self._batches = None
+        self._first_batch = None
+        self._encoding = None
+        self._lazy = None
+        if df is not None:
+            # Caller already parsed the file, don't read it again
+            self._set_dataframe(df)
+        elif self._should_stream():
+            self._open_batches()
+        else:
+            self._load_data()
+    
+    def _should_stream(self):
+        """Only large CSVs are worth streaming, and only with pyarrow"""
+        if pacsv is None or not self.filepath or self.options.get('engine') == 'polars':
+            return False
+        if os.path.splitext(self.filepath)[1].lower() not in ('.csv', ''):
+            return False
+        try:
+            return os.path.getsize(self.filepath) > self.options.get('stream_threshold', self.STREAM_THRESHOLD)
+        except OSError:
+            return False
+    
+    def _sniff_encoding(self):
+        """Detect the encoding once with the shared detector and remember it"""
+        if self._encoding is None:
+            try:
+                # Valid UTF-8 short-circuits there before chardet can mislabel it
+                encoding = detect_encoding(self.filepath) or 'utf-8'
+            except OSError:
+                encoding = 'utf-8'
+            # A pure-ASCII sample may still have UTF-8 further in, and pyarrow reads UTF-8 natively
+            self._encoding = 'utf-8' if encoding.lower() == 'ascii' else encoding
+        return self._encoding
+    
+    def _open_batches(self):
+        """Open a batched pyarrow reader; fall back to a full load on failure"""
+        logger.info("\nStreaming file: %s", self.filepath)
+        try:
+            encoding = self._sniff_encoding()
+            
+            self._batches = open_csv_arrow(
+                self.filepath,
+                read_options=pacsv.ReadOptions(encoding=encoding, block_size=self.STREAM_BLOCK_SIZE),
+                parse_options=pacsv.ParseOptions(invalid_row_handler=self._arrow_invalid_row),
+            )
+            try:
+                # Held back for _clean_streamed, which starts from it
+                self._first_batch = self._batches.read_next_batch()
+            except StopIteration:
+                # Header only, nothing to stream
+                self._batches = None
+                self._set_dataframe(pd.DataFrame())
+                return
+        except Exception as e:
+            logger.info("  Batched reader: ✗ (%s)", str(e)[:100])
+            self._batches = None
+            self._load_data()
+            return
+        
+        # Only a preview is materialized, the full frame comes out of clean_data
+        header = pandas_header(self._batches.schema.names)
+        preview = pa.Table.from_batches([self._first_batch.slice(0, 5)]).rename_columns(header)
+        self.df = preview.to_pandas()
+        self.original_shape = (0, len(self.df.columns))
+        logger.info("✓ Batched reader opened with %s", encoding)
+        logger.info("  Columns: %s", list(self.df.columns))
     
     def _load_data(self):
         """Load data from file with robust error handling"""
-        print(f"\nLoading file: {self.filepath}")
+        logger.info("\nLoading file: %s", self.filepath)
+        
+        if self.options.get('engine') == 'polars' and self._load_polars():
+            return
         
         ext = os.path.splitext(self.filepath)[1].lower()
         
@@ -29,24 +136,75 @@ class SimpleDataCleaner:
             # Try as CSV
             self.df = self._read_csv_robustly()
         
+        self._set_dataframe(self.df)
+    
+    def _load_polars(self):
+        """Plan a lazy polars scan of the CSV; False if polars can't take this file"""
+        try:
+            import polars as pl
+        except ImportError:
+            return False
+        
+        # Polars only decodes UTF-8, anything else goes through the pandas readers
+        if os.path.splitext(self.filepath)[1].lower() not in ('.csv', ''):
+            return False
+        if self._sniff_encoding().lower().replace('-', '').replace('_', '') not in ('utf8', 'utf8sig'):
+            return False
+        
+        try:
+            # Polars calls a blank header '' and a repeat 'a_duplicated_0', use pandas' names instead
+            with open(self.filepath, newline='', encoding='utf-8-sig') as f:
+                header = pandas_header(next(csv.reader(f)))
+            self._lazy = pl.scan_csv(self.filepath, ignore_errors=True, infer_schema_length=10000,
+                                     new_columns=header)
+            preview = self._lazy.head(5).collect()
+        except Exception as e:
+            logger.info("  Polars scan: ✗ (%s)", str(e)[:100])
+            self._lazy = None
+            return False
+        
+        # Only a preview is materialized, the full frame comes out of clean_data
+        self.df = preview.to_pandas()
+        self.original_shape = (0, preview.width)
+        logger.info("✓ Polars scan planned")
+        logger.info("  Columns: %s", list(self.df.columns))
+        return True
+    
+    def _set_dataframe(self, df):
+        """Record the loaded DataFrame and its original shape"""
+        self.df = df
         if self.df is not None and not self.df.empty:
             self.original_shape = self.df.shape
             self.report['original_rows'] = int(self.original_shape[0])
             self.report['original_columns'] = int(self.original_shape[1])
+            self._convert_string_columns()
             
-            print(f"✓ File loaded successfully!")
-            print(f"  Shape: {self.df.shape}")
-            print(f"  Columns: {list(self.df.columns)}")
+            logger.info("✓ File loaded successfully!")
+            logger.info("  Shape: %s", self.df.shape)
+            logger.info("  Columns: %s", list(self.df.columns))
         else:
-            print("✗ Failed to load file or file is empty")
+            logger.info("✗ Failed to load file or file is empty")
             self.df = pd.DataFrame()
             self.original_shape = (0, 0)
     
+    def _convert_string_columns(self):
+        """Move all-string object columns to Arrow-backed strings so later steps run in C"""
+        if _STRING_DTYPE is None:
+            return
+        
+        for col in self.df.select_dtypes(include=['object']).columns:
+            try:
+                if pd.api.types.infer_dtype(self.df[col], skipna=True) == 'string':
+                    self.df[col] = self.df[col].astype(_STRING_DTYPE)
+            except Exception:
+                continue
+    
     def _read_csv_robustly(self):
         """Read CSV file with multiple fallback strategies"""
         strategies = [
+            self._try_pyarrow_read,
             self._try_pandas_read,
-            self._try_csv_module,
+            self._try_sniffed_read,
             self._try_manual_parse,
         ]
         
@@ -57,55 +215,104 @@ class SimpleDataCleaner:
         
         return pd.DataFrame()
     
+    def _try_pyarrow_read(self):
+        """Try one multithreaded pyarrow read with a sniffed encoding"""
+        if pacsv is None:
+            return None
+        
+        try:
+            encoding = self._sniff_encoding()
+            
+            df = read_csv_arrow(
+                self.filepath,
+                read_options=pacsv.ReadOptions(encoding=encoding, block_size=1 << 20),
+                parse_options=pacsv.ParseOptions(invalid_row_handler=self._arrow_invalid_row),
+            )
+            logger.info("  PyArrow read with %s: ✓", encoding)
+            return df
+        except Exception as e:
+            logger.info("  PyArrow read: ✗ (%s)", str(e)[:100])
+            return None
+    
+    @staticmethod
+    def _arrow_invalid_row(row):
+        """Skip rows with extra fields like pandas does; short rows need pandas' padding"""
+        return 'skip' if row.actual_columns > row.expected_columns else 'error'
+    
+    def _candidate_encodings(self, fallbacks):
+        """Sniffed encoding first, the fixed list only as a last resort"""
+        sniffed = self._sniff_encoding()
+        return [sniffed] + [e for e in fallbacks if e.lower() != sniffed.lower()]
+    
     def _try_pandas_read(self):
         """Try reading with pandas"""
         encodings = ['utf-8', 'latin1', 'cp1252', 'iso-8859-1', 'utf-16']
         
-        for encoding in encodings:
+        for encoding in self._candidate_encodings(encodings):
             try:
                 df = pd.read_csv(self.filepath, encoding=encoding, on_bad_lines='skip', engine='python')
                 if not df.empty:
-                    print(f"  Pandas read with {encoding}: ✓")
+                    logger.info("  Pandas read with %s: ✓", encoding)
                     return df
             except Exception as e:
-                print(f"  Pandas read with {encoding}: ✗")
+                logger.info("  Pandas read with %s: ✗", encoding)
                 continue
         
         return None
     
-    def _try_csv_module(self):
-        """Try reading with Python's csv module"""
+    def _try_sniffed_read(self):
+        """Sniff the delimiter from the first 8 KB and read with the C engine"""
+        try:
+            with open(self.filepath, 'rb') as f:
+                sample = f.read(8192)
+        except Exception:
+            return None
+        
+        # Most frequent candidate byte in the sample wins, comma if none appear
+        counts = Counter(sample)
+        best = max(self._DELIMITER_BYTES, key=counts.__getitem__)
+        delimiter = chr(best) if counts[best] else ','
+        
         encodings = ['utf-8', 'latin1', 'cp1252', 'iso-8859-1']
         
-        for encoding in encodings:
+        for encoding in self._candidate_encodings(encodings):
             try:
-                with open(self.filepath, 'r', encoding=encoding, errors='replace') as f:
-                    # Read first line to detect delimiter
-                    first_line = f.readline()
-                    f.seek(0)
-                    
-                    # Detect delimiter
-                    delimiters = [',', ';', '\t', '|']
-                    delimiter_counts = {d: first_line.count(d) for d in delimiters}
-                    delimiter = max(delimiter_counts, key=delimiter_counts.get)
-                    
-                    # Read all rows
-                    reader = csv.reader(f, delimiter=delimiter)
-                    rows = list(reader)
-                    
-                    if rows and len(rows) > 1:
-                        # Create DataFrame
-                        df = pd.DataFrame(rows[1:], columns=rows[0])
-                        print(f"  CSV module with {encoding}: ✓")
-                        return df
+                df = pd.read_csv(self.filepath, sep=delimiter, engine='c', encoding=encoding,
+                                 encoding_errors='replace', on_bad_lines='skip')
+                if not df.empty:
+                    logger.info("  Sniffed read (%r) with %s: ✓", delimiter, encoding)
+                    return df
             except Exception as e:
-                print(f"  CSV module with {encoding}: ✗")
+                logger.info("  Sniffed read with %s: ✗", encoding)
                 continue
         
         return None
     
+    def _try_permissive_arrow_read(self):
+        """pyarrow read that skips every malformed row instead of failing"""
+        if pacsv is None:
+            return None
+        
+        try:
+            df = read_csv_arrow(
+                self.filepath,
+                read_options=pacsv.ReadOptions(encoding=self._sniff_encoding()),
+                parse_options=pacsv.ParseOptions(delimiter=',', newlines_in_values=True,
+                                                 invalid_row_handler=lambda row: 'skip'),
+            )
+            if df.empty:
+                return None
+            logger.info("  Manual parse (pyarrow): ✓")
+            return df
+        except Exception as e:
+            return None
+    
     def _try_manual_parse(self):
         """Manual parsing as last resort"""
+        df = self._try_permissive_arrow_read()
+        if df is not None:
+            return df
+        
         try:
             with open(self.filepath, 'r', encoding='utf-8', errors='ignore') as f:
                 lines = f.readlines()
@@ -128,29 +335,27 @@ class SimpleDataCleaner:
             for line in cleaned_lines:
                 rows.append([cell.strip() for cell in line.split(',')])
             
-            # Find max columns
-            max_cols = max(len(row) for row in rows) if rows else 0
-            
-            # Pad rows
-            for row in rows:
-                if len(row) < max_cols:
-                    row.extend([''] * (max_cols - len(row)))
-            
             # Create DataFrame
             if len(rows) > 1:
-                df = pd.DataFrame(rows[1:], columns=rows[0])
-                print("  Manual parse: ✓")
+                # Transpose and pad short rows (header included) in one pass
+                df = rows_to_frame(rows)
+                logger.info("  Manual parse: ✓")
                 return df
             else:
                 df = pd.DataFrame(columns=rows[0] if rows else [])
-                print("  Manual parse: ✓ (header only)")
+                logger.info("  Manual parse: ✓ (header only)")
                 return df
         except Exception as e:
-            print(f"  Manual parse: ✗")
+            logger.info("  Manual parse: ✗")
             return None
     
     def clean_data(self):
         """Simple cleaning pipeline"""
+        if self._batches is not None:
+            return self._clean_streamed()
+        if self._lazy is not None:
+            return self._clean_with_polars()
+        
         if self.df.empty:
             self.report['error'] = 'Empty DataFrame'
             return self.report
@@ -158,69 +363,420 @@ class SimpleDataCleaner:
         original_rows = self.original_shape[0]
         original_cols = self.original_shape[1]
         
-        print(f"\nStarting cleaning process...")
-        print(f"Initial shape: {self.df.shape}")
+        logger.info("\nStarting cleaning process...")
+        logger.info("Initial shape: %s", self.df.shape)
         
         # 1. Clean column names first
-        self.df.columns = [self._clean_column_name(col) for col in self.df.columns]
-        print(f"Cleaned column names: {list(self.df.columns)}")
+        self.df.columns = self._clean_column_names(self.df.columns)
+        logger.info("Cleaned column names: %s", list(self.df.columns))
+        
+        # One isnull pass shared by steps 2 and 3; dropping columns doesn't change the counts
+        null_counts = self.df.isnull().sum()
+        
+        # 2. Drop columns with too many missing values, and constant ones, before any other work
+        dropped = self._columns_to_drop(null_counts, len(self.df))
+        if dropped:
+            self.df = self.df.drop(columns=dropped)
+            null_counts = null_counts.drop(dropped)
         
-        # 2. Drop columns with too many missing values
+        self._clean_rows(null_counts)
+        return self._finish_report(original_rows, original_cols, 'Simple cleaning applied')
+    
+    def _columns_to_drop(self, null_counts, rows, distinct=None):
+        """Columns over the missing threshold, then constant ones among the rest"""
         threshold = self.options.get('missing_threshold', 0.5)
+        cols_to_drop = []
         if threshold < 1:  # Only if threshold is reasonable
-            missing_percent = self.df.isnull().sum() / len(self.df)
+            missing_percent = null_counts / rows
             cols_to_drop = missing_percent[missing_percent > threshold].index.tolist()
             if cols_to_drop:
-                print(f"Dropping columns with >{threshold*100}% missing: {cols_to_drop}")
-                self.df = self.df.drop(columns=cols_to_drop)
-        
-        # 3. Fill missing values (simplified)
-        for col in self.df.columns:
-            if self.df[col].isnull().any():
-                null_count = self.df[col].isnull().sum()
-                print(f"Column '{col}' has {null_count} missing values")
-                
-                if pd.api.types.is_numeric_dtype(self.df[col]):
-                    fill_value = self.df[col].median()
-                    self.df[col] = self.df[col].fillna(fill_value)
-                    print(f"  Filled with median: {fill_value}")
-                else:
-                    self.df[col] = self.df[col].fillna('Unknown')
-                    print(f"  Filled with 'Unknown'")
-        
-        # 4. Remove duplicates if requested
-        if self.options.get('handle_duplicates', 'drop') == 'drop':
-            duplicates_count = int(self.df.duplicated().sum())
-            if duplicates_count > 0:
-                print(f"Removing {duplicates_count} duplicate rows")
-                self.df = self.df.drop_duplicates()
-                self.report['duplicates_removed'] = duplicates_count
+                logger.info("Dropping columns with >%s%% missing: %s", threshold*100, cols_to_drop)
+        
+        const_cols = self._constant_columns(exclude=cols_to_drop, distinct=distinct, rows=rows)
+        if const_cols:
+            logger.info("Dropping constant columns: %s", const_cols)
+        return cols_to_drop + const_cols
+    
+    def _clean_rows(self, null_counts):
+        """Steps 3-5 of clean_data: fill gaps, drop duplicate rows, tidy text"""
+        # 3. Fill missing values (simplified), one fillna for all columns
+        affected = null_counts[null_counts > 0].index
+        if len(affected):
+            # Categorize dtypes once on a zero-row frame, nothing is copied
+            numeric_cols = set(self.df.head(0).select_dtypes(include=np.number).columns)
+            fill_map = {col: 'Unknown' for col in affected if col not in numeric_cols}
+            fill_map.update(self._medians([col for col in affected if col in numeric_cols]))
+            
+            # Per-column detail only when someone asked for it
+            if logger.isEnabledFor(logging.DEBUG):
+                for col in affected:
+                    logger.debug("Column '%s' has %s missing values", col, null_counts[col])
+                    if col in numeric_cols:
+                        logger.debug("  Filled with median: %s", fill_map[col])
+                    else:
+                        logger.debug("  Filled with 'Unknown'")
+            logger.info("Filled missing values in %s columns", len(affected))
+            
+            self.df.fillna(fill_map, inplace=True)
+        
+        # 4. Remove duplicates if requested (nothing to compare once every column is dropped)
+        if self.df.shape[1] and self.options.get('handle_duplicates', 'drop') == 'drop':
+            # A unique column (usually a leading ID) means no row can repeat
+            if self._has_unique_key():
+                logger.info("Key column is unique, no duplicate rows")
+            else:
+                self._drop_duplicate_rows()
         
         # 5. Standardize text if requested (carefully)
         if self.options.get('standardize_text'):
-            text_cols = self.df.select_dtypes(include=['object']).columns
+            text_cols = self.df.select_dtypes(include=['object', 'string']).columns
             for col in text_cols:
                 # Only clean if it doesn't look like currency or special data
-                sample = self.df[col].dropna().iloc[0] if not self.df[col].dropna().empty else ''
-                if not (isinstance(sample, str) and ('$' in sample or sample.startswith('['))):
-                    self.df[col] = self.df[col].astype(str).str.strip()
-        
-        # Generate report
+                if self._looks_special(self.df[col]):
+                    continue
+                # Arrow strings strip in one C++ kernel; no-op cast if already converted
+                self.df[col] = self.df[col].astype(_STRING_DTYPE or str).str.strip()
+    
+    def _finish_report(self, original_rows, original_cols, note):
+        """Fill in the final counts once self.df holds the cleaned frame"""
         self.report.update({
             'final_rows': int(len(self.df)),
             'final_columns': int(len(self.df.columns)),
             'rows_removed': int(original_rows - len(self.df)),
             'columns_removed': int(original_cols - len(self.df.columns)),
             'cleaning_timestamp': datetime.now().isoformat(),
-            'note': 'Simple cleaning applied'
+            'note': note
+        })
+        
+        logger.info("Final shape: %s", self.df.shape)
+        logger.info("Rows removed: %s", self.report['rows_removed'])
+        logger.info("Columns removed: %s", self.report['columns_removed'])
+        
+        return self.report
+    
+    def _medians(self, columns):
+        """Median of each column, estimated on long frames unless fast_median is off"""
+        if (pacsv is not None and self.options.get('fast_median', True)
+                and len(self.df) >= self.APPROX_MEDIAN_ROWS):
+            return {col: self._approximate_median(self.df[col]) for col in columns}
+        return self._exact_medians(columns)
+    
+    @staticmethod
+    def _approximate_median(column):
+        """t-digest median from pyarrow.compute, over the column's own numpy buffer"""
+        # from_pandas turns NaN into nulls; the values themselves are not copied
+        values = pa.array(column.to_numpy(), from_pandas=True)
+        median = pc.approximate_median(values).as_py()
+        return np.nan if median is None else median
+    
+    def _exact_medians(self, columns):
+        """Exact median of each column, spread over threads when there are many"""
+        if Parallel is None or len(columns) < self.PARALLEL_MEDIAN_COLUMNS:
+            return {col: self.df[col].median() for col in columns}
+        
+        # numpy releases the GIL while partitioning, so threads scale without copying the frame
+        medians = Parallel(n_jobs=-1, prefer='threads')(
+            delayed(self._nanmedian)(self.df[col].to_numpy(dtype=float, na_value=np.nan))
+            for col in columns
+        )
+        return dict(zip(columns, medians))
+    
+    @staticmethod
+    def _nanmedian(values):
+        """np.nanmedian without its extra passes; NaN for an all-missing column"""
+        values = values[~np.isnan(values)]
+        return float(np.median(values)) if len(values) else np.nan
+    
+    def _looks_special(self, column, rows=100):
+        """Probe only the leading rows of a text column for currency or list values"""
+        return bool(column.head(rows).astype(str).str.match(self._SPECIAL_TEXT, na=False).any())
+    
+    def _constant_columns(self, exclude=(), distinct=None, rows=None):
+        """Columns with at most one distinct value, null included; they carry no information"""
+        if (len(self.df) if rows is None else rows) < 2:
+            return []
+        if distinct is None:
+            distinct = self._distinct_counts()
+        
+        excluded = set(exclude)
+        candidates = [col for col in distinct if col not in excluded]
+        const_cols = [col for col in candidates if distinct[col] <= 1]
+        
+        # A frame that is constant all the way across is still the data, keep it
+        if len(const_cols) == len(candidates):
+            return []
+        return const_cols
+    
+    def _distinct_counts(self):
+        """Distinct values per column, null counting as one, capped at 2 (all _constant_columns needs)"""
+        distinct = {}
+        for col in self.df.columns.unique():
+            try:
+                distinct[col] = min(int(self.df[col].nunique(dropna=False)), 2)
+            except (TypeError, ValueError):
+                # Unhashable cell values, or duplicate column names
+                distinct[col] = 2
+        return distinct
+    
+    def _has_unique_key(self, max_columns=3):
+        """Check the leading columns for one whose values are all distinct"""
+        for i in range(min(max_columns, len(self.df.columns))):
+            if self.df.iloc[:, i].is_unique:
+                return True
+        return False
+    
+    def _drop_duplicate_rows(self):
+        """Drop repeated rows, exactly or through the Bloom filter"""
+        if self.df.shape[1] == 0:
+            # hash_pandas_object can't hash rows without columns
+            return
+        
+        # Dedup on one uint64 fingerprint per row instead of every column
+        hashes = pd.util.hash_pandas_object(self.df, index=False).to_numpy()
+        if self.options.get('approximate_duplicates'):
+            mask = self._approximate_duplicate_mask(hashes)
+            self.report['approximate'] = True
+        else:
+            mask = self._duplicate_mask(hashes)
+        duplicates_count = int(mask.sum())
+        if duplicates_count > 0:
+            logger.info("Removing %s duplicate rows", duplicates_count)
+            # A fresh frame, not a view, so the text step can assign columns
+            self.df = self.df.loc[~mask].reset_index(drop=True)
+            self.report['duplicates_removed'] = duplicates_count
+    
+    @staticmethod
+    def _duplicate_mask(hashes):
+        """Mark every repeat of an earlier row hash, like DataFrame.duplicated()"""
+        if len(hashes) > 10_000_000:
+            # Sorting the uint64s beats pandas' hash table on very large frames
+            _, first = np.unique(hashes, return_index=True)
+            mask = np.ones(len(hashes), dtype=bool)
+            mask[first] = False
+            return mask
+        return pd.Index(hashes).duplicated()
+    
+    @staticmethod
+    def _approximate_duplicate_mask(hashes, bits_per_row=10, num_hashes=7, chunk_size=1 << 16):
+        """Bloom filter dedup: a row is dropped when earlier rows already set all its bits.
+        
+        Repeats inside a chunk are found exactly; across chunks the filter never
+        misses a duplicate but can drop a unique row (<1% at 10 bits per row).
+        """
+        n = len(hashes)
+        m = np.uint64(max(64, n * bits_per_row))
+        bits = np.zeros(int(m + np.uint64(7)) // 8, dtype=np.uint8)
+        
+        # Double hashing: probe i of a row is h1 + i * h2, h2 a rotation of h1
+        h2 = ((hashes >> np.uint64(32)) | (hashes << np.uint64(32))) | np.uint64(1)
+        steps = np.arange(num_hashes, dtype=np.uint64)
+        mask = np.zeros(n, dtype=bool)
+        
+        for start in range(0, n, chunk_size):
+            h = hashes[start:start + chunk_size]
+            positions = (h[:, None] + steps * h2[start:start + chunk_size, None]) % m
+            byte_idx = positions >> np.uint64(3)
+            bit_val = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+            
+            chunk_mask = (bits[byte_idx] & bit_val).all(axis=1) | pd.Index(h).duplicated()
+            mask[start:start + chunk_size] = chunk_mask
+            np.bitwise_or.at(bits, byte_idx[~chunk_mask].ravel(), bit_val[~chunk_mask].ravel())
+        
+        return mask
+    
+    def _clean_with_polars(self):
+        """Run the clean_data steps as one lazy polars plan and collect it once"""
+        import polars as pl
+        
+        lf, self._lazy = self._lazy, None
+        threshold = self.options.get('missing_threshold', 0.5)
+        
+        try:
+            schema = lf.collect_schema()
+            original = schema.names()
+            names = list(self._clean_column_names(original))
+            lf = lf.rename(dict(zip(original, names)))
+            text_cols = [c for c, dtype in zip(names, schema.dtypes()) if dtype == pl.String]
+            numeric_cols = {c for c, dtype in zip(names, schema.dtypes()) if dtype.is_numeric()}
+            logger.info("\nStarting polars cleaning process...")
+            logger.info("Cleaned column names: %s", names)
+            
+            # One aggregate pass for row count, null counts, distinct counts and the text probe
+            stats = lf.select(
+                [pl.len().alias('rows:')]
+                + [pl.col(c).null_count().alias(f'null:{c}') for c in names]
+                + [pl.col(c).n_unique().alias(f'distinct:{c}') for c in names]
+                # Only the leading rows, like _looks_special
+                + [pl.col(c).head(100).str.contains(r'\$|^\[').any().alias(f'special:{c}') for c in text_cols]
+            ).collect().row(0, named=True)
+            rows = stats['rows:']
+            
+            cols_to_drop = []
+            if threshold < 1 and rows:
+                cols_to_drop = [c for c in names if stats[f'null:{c}'] / rows > threshold]
+                if cols_to_drop:
+                    logger.info("Dropping columns with >%s%% missing: %s", threshold*100, cols_to_drop)
+            const_cols = [c for c in names
+                          if rows >= 2 and c not in cols_to_drop and stats[f'distinct:{c}'] <= 1]
+            if len(const_cols) + len(cols_to_drop) == len(names):
+                # Same rule as _constant_columns: never drop the last columns for being constant
+                const_cols = []
+            if const_cols:
+                logger.info("Dropping constant columns: %s", const_cols)
+            dropped = set(cols_to_drop + const_cols)
+            kept = [c for c in names if c not in dropped]
+            lf = lf.drop(cols_to_drop + const_cols)
+            
+            fills = [pl.col(c).fill_null(pl.col(c).median()) if c in numeric_cols
+                     else pl.col(c).cast(pl.String).fill_null('Unknown')
+                     for c in kept if stats[f'null:{c}']]
+            if fills:
+                lf = lf.with_columns(fills)
+                logger.info("Filled missing values in %s columns", len(fills))
+            
+            if self.options.get('handle_duplicates', 'drop') == 'drop':
+                lf = lf.unique(maintain_order=True)
+            
+            if self.options.get('standardize_text'):
+                strip = [pl.col(c).str.strip_chars() for c in text_cols
+                         if c in kept and not stats[f'special:{c}']]
+                if strip:
+                    lf = lf.with_columns(strip)
+            
+            result = self._collect(lf)
+        except Exception as e:
+            logger.info("  Polars clean: ✗ (%s), using pandas", str(e)[:100])
+            self._set_dataframe(self._read_csv_robustly())
+            return self.clean_data()
+        
+        self.df = result.to_pandas()
+        self._convert_string_columns()
+        self.original_shape = (rows, len(names))
+        duplicates = rows - result.height
+        if duplicates:
+            logger.info("Removing %s duplicate rows", duplicates)
+            self.report['duplicates_removed'] = int(duplicates)
+        
+        self.report.update({
+            'original_rows': int(rows),
+            'original_columns': int(len(names)),
+            'final_rows': int(len(self.df)),
+            'final_columns': int(len(self.df.columns)),
+            'rows_removed': int(rows - len(self.df)),
+            'columns_removed': int(len(names) - len(self.df.columns)),
+            'cleaning_timestamp': datetime.now().isoformat(),
+            'note': 'Simple cleaning applied with polars'
         })
         
-        print(f"Final shape: {self.df.shape}")
-        print(f"Rows removed: {self.report['rows_removed']}")
-        print(f"Columns removed: {self.report['columns_removed']}")
+        logger.info("Final shape: %s", self.df.shape)
+        logger.info("Rows removed: %s", self.report['rows_removed'])
+        logger.info("Columns removed: %s", self.report['columns_removed'])
         
         return self.report
     
+    @staticmethod
+    def _collect(lf):
+        """Collect with the streaming engine, whichever way this polars spells it"""
+        try:
+            return lf.collect(engine='streaming')
+        except TypeError:
+            return lf.collect(streaming=True)
+    
+    def _clean_streamed(self):
+        """Clean a batched CSV in two passes, loading only the columns that are kept.
+        
+        The first pass streams the batches for the row, null and distinct counts
+        that decide which columns clean_data would drop; the second reads the
+        remaining columns and runs the rest of clean_data on them unchanged.
+        """
+        header = pandas_header(self._first_batch.schema.names)
+        batches = chain([self._first_batch], self._batches)
+        self._batches = self._first_batch = None
+        
+        try:
+            names = self._clean_column_names(header)
+            logger.info("\nStarting streaming cleaning process...")
+            logger.info("Cleaned column names: %s", list(names))
+            rows, null_counts, distinct = self._stream_counts(batches, header, names)
+            if not rows:
+                self._set_dataframe(pd.DataFrame())
+                self.report['error'] = 'Empty DataFrame'
+                return self.report
+            
+            dropped = set(self._columns_to_drop(null_counts, rows, distinct))
+            kept = [i for i, name in enumerate(names) if name not in dropped]
+            if kept:
+                df = read_csv_arrow(
+                    self.filepath,
+                    read_options=pacsv.ReadOptions(encoding=self._encoding, block_size=1 << 20,
+                                                   skip_rows=1, column_names=header),
+                    parse_options=pacsv.ParseOptions(invalid_row_handler=self._arrow_invalid_row),
+                    include_columns=[header[i] for i in kept],
+                )
+            else:
+                df = pd.DataFrame(index=pd.RangeIndex(rows))
+        except Exception as e:
+            # Types are inferred from the first block, later blocks can disagree
+            logger.info("  Streaming clean: ✗ (%s), loading whole file", str(e)[:100])
+            self._load_data()
+            return self.clean_data()
+        
+        self.df = df
+        self._convert_string_columns()
+        self.df.columns = names[kept]
+        self.original_shape = (rows, len(header))
+        self.report['original_rows'] = int(rows)
+        self.report['original_columns'] = int(len(header))
+        
+        self._clean_rows(null_counts.iloc[kept])
+        return self._finish_report(rows, len(header), 'Simple cleaning applied in two streaming passes')
+    
+    def _stream_counts(self, batches, header, names):
+        """Row count, per-column null counts and capped distinct counts over every batch"""
+        rows = 0
+        nulls = np.zeros(len(names), dtype=np.int64)
+        # Up to two distinct non-null values per column; None once a column can't be constant
+        seen = {name: set() for name in names.unique()}
+        for name in names[names.duplicated()]:
+            # As in _distinct_counts, a repeated name is never treated as constant
+            seen[name] = None
+        
+        for i, batch in enumerate(batches):
+            df = pa.Table.from_batches([batch]).rename_columns(header)
+            df = df.to_pandas(split_blocks=True, self_destruct=True)
+            df.columns = names
+            rows += len(df)
+            nulls += df.isnull().sum().to_numpy()
+            for name, values in seen.items():
+                if values is None:
+                    continue
+                try:
+                    values.update(df[name].dropna().unique()[:2])
+                except TypeError:
+                    values = None
+                if values is None or len(values) > 1:
+                    seen[name] = None
+            logger.info("  Batch %s: %s rows", i + 1, len(df))
+        
+        null_counts = pd.Series(nulls, index=names)
+        # Nulls count as one more value, as in _distinct_counts
+        distinct = {name: 2 if values is None else len(values) + bool(null_counts[name])
+                    for name, values in seen.items()}
+        return rows, null_counts, distinct
+    
+    def _clean_column_names(self, columns):
+        """Clean all column names at once, same rules as _clean_column_name"""
+        index = pd.Index(columns, dtype=object)
+        missing = index.isna()
+        names = index.astype(str).str.strip()
+        if all(name.isascii() for name in names):
+            names = names.str.translate(_ASCII_SPECIAL)
+        else:
+            names = names.str.replace(_RE_SPECIAL, '', regex=True)
+        names = names.str.replace(_RE_SPACE, '_', regex=True).str.lower()
+        names = names.where(~missing, 'unknown_column')
+        return names.where(names != '', 'column')
+    
     def _clean_column_name(self, col):
         """Clean a single column name"""
         if pd.isna(col):
@@ -229,19 +785,10 @@ class SimpleDataCleaner:
         col = str(col).strip()
         
         # Remove special characters but keep underscores
-        col = re.sub(r'[^\w\s]', '', col)
+        col = col.translate(_ASCII_SPECIAL) if col.isascii() else _RE_SPECIAL.sub('', col)
         
         # Replace spaces with underscores
-        col = re.sub(r'\s+', '_', col)
-        
-        # Convert to lowercase
-        col = col.lower()
+        col = _RE_SPACE.sub('_', col)
         
-        # If empty after cleaning
-        if not col:
-            return 'column'
-        
-        return col
-
-# Add regex import if not already there
-import re
\ No newline at end of file
+        # Lowercase, 'column' if nothing is left
+        return col.lower() or 'column'